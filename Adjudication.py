@@ -0,0 +1,110 @@
+import chess
+import chess.syzygy
+from typing import Optional, Tuple
+
+# 默认裁决阈值 (分数单位为厘兵)
+DEFAULT_ADJUDICATION = {
+    "resign_score": 1000,   # 认输：双方引擎都认为一方落后超过该分数
+    "resign_moves": 3,      # ……并连续保持这么多步 (每方各计)
+    "draw_score": 10,       # 和棋：双方引擎的分数都在 ±draw_score 以内
+    "draw_moves": 8,        # ……并连续保持这么多步
+    "draw_start": 40,       # 第几回合之后才允许按分数判和
+    "material_draw": True,  # 无兵且双方都无法强行将杀的子力 (如 KNvKB) 直接判和
+    "syzygy": None,         # Syzygy 残局库目录，给定时残局库覆盖的局面按库判定胜负
+}
+
+
+def is_trivial_draw(board: chess.Board) -> bool:
+    """
+    无需残局库即可判定的和棋子力：没有兵、车、后，
+    且每方至多一个轻子，或一方两马对光王。
+    """
+    if board.pawns or board.rooks or board.queens:
+        return False
+    minors = {color: len(board.pieces(chess.KNIGHT, color)) + len(board.pieces(chess.BISHOP, color))
+              for color in chess.COLORS}
+    if max(minors.values()) <= 1:
+        return True
+    for color in chess.COLORS:
+        if minors[not color] == 0 and minors[color] == 2 and len(board.pieces(chess.KNIGHT, color)) == 2:
+            return True
+    return False
+
+
+class Adjudicator:
+    """
+    对局裁决。每走一步调用 update，传入走棋方引擎给出的分数 (走棋方视角，厘兵)。
+    按分数认输/判和要求双方引擎都连续给出分数并达成一致；某一步没有分数 (None，
+    如 RandomAI 或一层都没搜完) 时该方的连续计数清零，因此有不报告分数的一方时只按子力/残局库裁决。
+    满足条件时返回 (结果, 原因)，否则返回 None。
+    """
+
+    def __init__(self, resign_score=1000, resign_moves=3, draw_score=10, draw_moves=8,
+                 draw_start=40, material_draw=True, syzygy=None):
+        self.resign_score = resign_score
+        self.resign_moves = resign_moves
+        self.draw_score = draw_score
+        self.draw_moves = draw_moves
+        self.draw_start = draw_start
+        self.material_draw = material_draw
+        self.tablebase = chess.syzygy.open_tablebase(syzygy) if syzygy else None
+
+        self.losing_side = None  # 当前连续被判落后的一方
+        self.resign_streak = {chess.WHITE: 0, chess.BLACK: 0}
+        self.draw_streak = {chess.WHITE: 0, chess.BLACK: 0}
+
+    def close(self):
+        if self.tablebase is not None:
+            self.tablebase.close()
+
+    def update(self, board: chess.Board, color: chess.Color, score: Optional[int]) -> Optional[Tuple[str, str]]:
+        """board 为走完这一步后的局面，color 为刚走棋的一方"""
+        verdict = self._material_verdict(board)
+        if verdict:
+            return verdict
+        if score is None:
+            self.resign_streak[color] = 0
+            self.draw_streak[color] = 0
+            return None
+
+        white_score = score if color == chess.WHITE else -score
+
+        # 认输：双方引擎连续认为同一方大幅落后
+        if white_score >= self.resign_score:
+            losing = chess.BLACK
+        elif white_score <= -self.resign_score:
+            losing = chess.WHITE
+        else:
+            losing = None
+        if losing != self.losing_side:
+            self.resign_streak = {chess.WHITE: 0, chess.BLACK: 0}
+            self.losing_side = losing
+        if losing is not None:
+            self.resign_streak[color] += 1
+            if all(self.resign_streak[c] >= self.resign_moves for c in chess.COLORS):
+                return ("0-1" if losing == chess.WHITE else "1-0"), "resign"
+
+        # 和棋：开局阶段之后，双方引擎连续给出接近 0 的分数
+        if board.fullmove_number > self.draw_start and abs(white_score) <= self.draw_score:
+            self.draw_streak[color] += 1
+            if all(self.draw_streak[c] >= self.draw_moves for c in chess.COLORS):
+                return "1/2-1/2", "draw score"
+        else:
+            self.draw_streak = {chess.WHITE: 0, chess.BLACK: 0}
+        return None
+
+    def _material_verdict(self, board: chess.Board) -> Optional[Tuple[str, str]]:
+        if self.material_draw and is_trivial_draw(board):
+            return "1/2-1/2", "material draw"
+        if self.tablebase is not None and chess.popcount(board.occupied) <= chess.syzygy.TBPIECES \
+                and not board.castling_rights:
+            try:
+                wdl = self.tablebase.probe_wdl(board)  # 走棋方视角：2 胜, -2 负, 其余 (含 50 步规则下的胜负) 为和
+            except KeyError:  # 缺少对应的残局库文件
+                return None
+            if wdl == 2:
+                return ("1-0" if board.turn == chess.WHITE else "0-1"), "tablebase"
+            if wdl == -2:
+                return ("0-1" if board.turn == chess.WHITE else "1-0"), "tablebase"
+            return "1/2-1/2", "tablebase"
+        return None
@@ -1,8 +1,11 @@
 import datetime
 import random
 import sys
+import time
 import chess
 from typing import Dict, List, Optional, Tuple
+from SearchControl import LIMIT_CHECK_INTERVAL, SearchAborted, move_deadline
+from SearchInfo import SearchInfo, progress_info
 
 class AlphaBetaAI():
     def __init__(self, depth: int, is_white: bool):
@@ -11,6 +14,20 @@ class AlphaBetaAI():
         self.nodes_visited = 0
         self.transposition_table: Dict[str, Tuple[int, int, chess.Move]] = {}  # 置换表
         self.killer_moves: Dict[int, List[chess.Move]] = {}  # 杀手启发
+        self.clock = None  # 对局棋钟 (由 ChessGame 设置)，有棋钟时按分配的时间搜索
+        self.deadline: Optional[float] = None
+        self.node_limit: Optional[int] = None  # 节点数上限 (None 表示只按深度搜索)
+        self.stop_requested = False  # 由 stop() 设置 (例如 GUI 的"立即走棋")
+        self.limit_check_interval = LIMIT_CHECK_INTERVAL  # 每隔多少个节点检查一次限制
+        self.next_limit_check = sys.maxsize
+        self.info_sink = None  # 搜索信息输出 (见 SearchInfo)，为 None 时不发布逐层信息
+        self.last_info: Optional[SearchInfo] = None  # 最近一次搜索的最终统计
+        self.progress_interval: Optional[float] = None  # 设置后 (且有 info_sink) 搜索中每隔这么多秒发布一次进度
+        self.last_iteration: Optional[SearchInfo] = None  # 本次搜索最近完成的一层
+        self.search_start = 0.0
+        self.next_progress = 0.0
+        self.tt_hits = 0
+        self.cutoffs = 0
         
         # 增强的棋子价值表
         self.piece_values = {
@@ -42,20 +59,49 @@ class AlphaBetaAI():
             ]
         }
 
+    def new_game(self):
+        """清空对局相关的状态 (置换表、杀手走法、棋钟)，以便同一实例连续下多局"""
+        self.transposition_table.clear()
+        self.killer_moves.clear()
+        self.last_info = None
+        self.clock = None
+
     def choose_move(self, board: chess.Board) -> chess.Move:
         """选择最佳移动"""
         self.nodes_visited = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
         best_move = None
-        best_value = -sys.maxsize
+        best_value = None
+        completed_depth = 0
+        start_time = time.time()
+        root_ply = len(board.move_stack)
+        self.deadline = move_deadline(self.clock, board.turn, start_time)
+        # 搜索开始前 (线程已启动但还没进入 choose_move 时) 收到的停止请求在第一个节点生效
+        self.next_limit_check = 0 if self.stop_requested else min(self.limit_check_interval, self.node_limit or sys.maxsize)
+        self.search_start = start_time
+        self.next_progress = start_time + (self.progress_interval or 0)
+        self.last_iteration = None
         
         # 迭代加深搜索
         for current_depth in range(1, self.depth + 1):
+            # 已用掉一半时间时不再加深
+            if self.deadline and best_move and time.time() - start_time > (self.deadline - start_time) / 2:
+                break
             try:
                 move, value = self.alpha_beta_search(board, current_depth)
                 if move:
                     best_move = move
                     best_value = value
-                    print(f"Depth {current_depth}: {move} (eval: {value})")
+                    completed_depth = current_depth
+                    if self.info_sink is not None:
+                        self.last_iteration = self.search_info(completed_depth, best_value, [move], start_time)
+                        self.info_sink(self.last_iteration)
+            except SearchAborted:
+                # 时间用完：恢复到根局面，使用上一层完整搜索的结果
+                while len(board.move_stack) > root_ply:
+                    board.pop()
+                break
             except Exception as e:
                 print(f"Search error at depth {current_depth}: {e}")
                 break
@@ -64,9 +110,19 @@ class AlphaBetaAI():
             # 备用：随机选择合法移动
             best_move = random.choice(list(board.legal_moves))
         
-        print(f"AlphaBeta AI recommending move {best_move} at depth {self.depth}, nodes visited: {self.nodes_visited}")
+        self.last_info = self.search_info(completed_depth, best_value, [best_move], start_time, final=True)
+        if self.info_sink is not None:
+            self.info_sink(self.last_info)
+        self.stop_requested = False  # 停止请求只作用于本次搜索
         return best_move
 
+    def search_info(self, depth: int, score: Optional[int], pv: List[chess.Move], start_time: float,
+                    final: bool = False) -> SearchInfo:
+        """当前搜索的统计信息 (没有静态搜索，主要变例只含根节点走法)"""
+        return SearchInfo(engine=type(self).__name__, depth=depth, score=score, pv=pv,
+                          nodes=self.nodes_visited, tt_hits=self.tt_hits, cutoffs=self.cutoffs,
+                          time=time.time() - start_time, final=final)
+
     def alpha_beta_search(self, board: chess.Board, max_depth: int) -> Tuple[Optional[chess.Move], int]:
         """带alpha-beta剪枝的搜索"""
         best_move = None
@@ -79,7 +135,8 @@ class AlphaBetaAI():
         
         for move in moves:
             board.push(move)
-            value = -self.alpha_beta(board, max_depth - 1, -beta, -alpha, False)
+            # alpha_beta 返回 AI 视角的分数 (见 advanced_evaluation)，根节点直接取最大值，不取负
+            value = self.alpha_beta(board, max_depth - 1, alpha, beta, False)
             board.pop()
             
             if value > best_value:
@@ -97,6 +154,8 @@ class AlphaBetaAI():
     def alpha_beta(self, board: chess.Board, depth: int, alpha: int, beta: int, maximizing: bool) -> int:
         """Alpha-beta剪枝核心算法"""
         self.nodes_visited += 1
+        if self.nodes_visited >= self.next_limit_check:
+            self.check_limits()
         
         # 终止条件检查
         if depth == 0 or board.is_game_over():
@@ -105,6 +164,7 @@ class AlphaBetaAI():
         # 置换表查询
         board_key = board.fen()
         if board_key in self.transposition_table:
+            self.tt_hits += 1
             tt_depth, tt_value, _ = self.transposition_table[board_key]
             if tt_depth >= depth:
                 return tt_value
@@ -128,6 +188,7 @@ class AlphaBetaAI():
             
             # Alpha-beta剪枝
             if alpha >= beta:
+                self.cutoffs += 1
                 self.store_killer_move(depth, move)
                 break
         
@@ -136,6 +197,35 @@ class AlphaBetaAI():
         
         return best_value
 
+    def publish_progress(self):
+        """搜索进行中发布进度 (由 check_limits 调用，至多每 progress_interval 秒一次)"""
+        now = time.time()
+        if now < self.next_progress:
+            return
+        self.next_progress = now + self.progress_interval
+        self.info_sink(progress_info(self.last_iteration, type(self).__name__, nodes=self.nodes_visited,
+                                     tt_hits=self.tt_hits, cutoffs=self.cutoffs, time=now - self.search_start))
+
+    def stop(self):
+        """
+        请求停止搜索 (可从其他线程调用)：下一个节点即中止，返回已完成的最深一层的最佳走法；
+        在搜索开始前调用同样有效，请求在本次搜索结束时清除
+        """
+        self.stop_requested = True
+        self.next_limit_check = 0
+
+    def check_limits(self):
+        """周期性检查搜索限制，超出时中止搜索"""
+        if self.stop_requested:
+            raise SearchAborted()
+        if self.node_limit and self.nodes_visited >= self.node_limit:
+            raise SearchAborted()
+        if self.deadline and time.time() >= self.deadline:
+            raise SearchAborted()
+        if self.progress_interval and self.info_sink is not None:
+            self.publish_progress()
+        self.next_limit_check = min(self.nodes_visited + self.limit_check_interval, self.node_limit or sys.maxsize)
+
     def order_moves(self, board: chess.Board) -> List[chess.Move]:
         """移动排序：优先搜索好的移动"""
         moves = list(board.legal_moves)
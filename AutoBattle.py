@@ -1,112 +1,602 @@
-import sys
 import os
+import argparse
+import json
+import random
+import zlib
 import chess
+import chess.pgn
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Tuple
 
+from itertools import combinations
+
+from Adjudication import DEFAULT_ADJUDICATION, Adjudicator
+from ChessGame import ChessClock, ChessGame
+from MatchStats import SPRT, elo_estimate, fit_ratings
+from Openings import load_openings, random_balanced_openings
+
 # 引入现有的 AI 类
 from RandomAI import RandomAI
+from AlphaBetaAI import AlphaBetaAI
 from IterativeDeepeningMinimaxAI import IterativeDeepeningMinimaxAI
 from BetterAlphaBetaAI import BetterAlphaBetaAI
-from NeuralNetAI import NeuralNetAI
 
-# --- 工具类：用于隐藏 AI 思考时的控制台输出 ---
-class HiddenPrints:
-    def __enter__(self):
-        self._original_stdout = sys.stdout
-        sys.stdout = open(os.devnull, 'w')
+# --- AI 工厂函数 ---
+# 已注册的引擎名称；引擎配置写作 "名称" 或 "名称:选项=值,..."，
+# 例如 "BetterAlphaBeta:depth=4"、"BetterAlphaBeta:nullmove=0"、"NeuralNetAI:depth=2,model=./AI-chess/model/chess_model_student_tiny.keras"
+REGISTERED_ENGINES = ["RandomAI", "ID-Minimax", "AlphaBeta", "BetterAlphaBeta", "NeuralNetAI"]
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout.close()
-        sys.stdout = self._original_stdout
+def parse_engine_spec(spec: str):
+    """拆分引擎配置字符串，返回 (名称, 选项字典)"""
+    ai_name, _, option_text = spec.partition(":")
+    options = {}
+    for item in option_text.split(","):
+        if item:
+            key, _, value = item.partition("=")
+            options[key.strip()] = value.strip()
+    if ai_name not in REGISTERED_ENGINES:
+        raise ValueError(f"Unknown AI: {ai_name}")
+    return ai_name, options
+
+# 限时对局中未指定深度时使用的深度上限，实际深度由棋钟分配的时间决定
+TIMED_MAX_DEPTH = 64
+
+def create_ai(ai_spec: str, is_white: bool, seed=None, timed=False):
+    """
+    根据名称 (或引擎配置字符串) 创建 AI 实例，未指定深度时使用默认难度深度。
+    timed: 限时对局，未指定深度时不限深度 (由棋钟截止)
+    """
+    ai_name, options = parse_engine_spec(ai_spec)
+
+    def depth(default):
+        return int(options.get("depth", TIMED_MAX_DEPTH if timed else default))
 
-# --- AI 工厂函数 ---
-def create_ai(ai_name: str, is_white: bool):
-    """根据名称创建 AI 实例，设定默认难度深度"""
     if ai_name == "RandomAI":
-        return RandomAI()
+        return RandomAI(seed)
     elif ai_name == "ID-Minimax":
         # 默认深度 2，与你原本的 GUI 设置一致
-        return IterativeDeepeningMinimaxAI(2, is_white)
+        return IterativeDeepeningMinimaxAI(depth(2), is_white)
+    elif ai_name == "AlphaBeta":
+        return AlphaBetaAI(depth(3), is_white)
     elif ai_name == "BetterAlphaBeta":
-        # 默认深度 3
-        return BetterAlphaBetaAI(3, is_white)
+        # 默认深度 3；nullmove=0 关闭空着裁剪 (用于比较剪枝对棋力的影响)
+        ai = BetterAlphaBetaAI(depth(3), is_white)
+        ai.null_move = options.get("nullmove", "1") != "0"
+        ai.collect_stats = True  # 逐步注释中记录选择性深度 (move_comment)
+        return ai
     elif ai_name == "NeuralNetAI":
-        # 默认深度 2
-        return NeuralNetAI(2, is_white)
-    else:
-        raise ValueError(f"Unknown AI: {ai_name}")
+        # 默认深度 2 (延迟导入，不需要时不加载 TensorFlow)
+        from NeuralNetAI import NeuralNetAI, DEFAULT_MODEL_PATH
+        return NeuralNetAI(depth(2), is_white, options.get("model", DEFAULT_MODEL_PATH))
+
+# 工作进程内的引擎池：(配置, 执白, 限时) -> 引擎实例。
+# 每种配置只创建一次 (模型加载、表初始化只做一次)，之后每局调用 new_game 重置对局状态
+_engine_pool = {}
+
+def acquire_ai(ai_spec: str, is_white: bool, seed=None, timed=False):
+    """从引擎池取出 (或创建) 引擎并重置为新对局状态；没有 new_game 的引擎 (RandomAI) 每局新建"""
+    key = (ai_spec, is_white, timed)
+    engine = _engine_pool.get(key)
+    if engine is not None:
+        engine.new_game()
+        return engine
+    engine = create_ai(ai_spec, is_white, seed, timed)
+    if hasattr(engine, "new_game"):
+        _engine_pool[key] = engine
+    return engine
 
 # --- 单局游戏逻辑 ---
-def play_single_game(white_ai_name, black_ai_name, max_moves=200) -> str:
+def reported_score(player):
+    """引擎本步搜索给出的分数 (走棋方视角，厘兵)，取自 last_info；没有评估的引擎为 None"""
+    info = getattr(player, 'last_info', None)
+    return info.score if info is not None else None
+
+def move_comment(player, elapsed: float, clock_left=None) -> str:
     """
-    运行一局游戏。
-    返回: "1-0" (白胜), "0-1" (黑胜), "1/2-1/2" (平局)
+    单步注释：引擎分数 (兵，走棋方视角)、完成深度、选择性深度、节点数、用时、(限时对局) 剩余时间。
+    深度与节点数取自引擎发布的 SearchInfo (last_info)
+    """
+    parts = []
+    score = reported_score(player)
+    if score is not None:
+        parts.append(f"eval={score / 100:+.2f}")
+    info = getattr(player, 'last_info', None)
+    if info is not None and info.depth:
+        parts.append(f"depth={info.depth}")
+        if info.seldepth > info.depth:
+            parts.append(f"seldepth={info.seldepth}")
+    if info is not None and info.nodes:
+        parts.append(f"nodes={info.nodes}")
+    parts.append(f"time={elapsed:.3f}s")
+    if clock_left is not None:
+        parts.append(f"clock={clock_left:.3f}s")
+    return " ".join(parts)
+
+def add_clock_stats(record: dict, clock: ChessClock):
+    """限时对局：记录每步用时 move_times 和双方剩余时间 clock_left"""
+    record["move_times"] = {"white": [round(t, 3) for t in clock.move_times[chess.WHITE]],
+                            "black": [round(t, 3) for t in clock.move_times[chess.BLACK]]}
+    record["clock_left"] = {"white": round(clock.remaining[chess.WHITE], 3),
+                            "black": round(clock.remaining[chess.BLACK], 3)}
+
+def play_game(white_ai_name, black_ai_name, max_moves=200, seed=None, start_fen=None, time_control=None,
+              adjudication=None) -> dict:
+    """
+    运行一局游戏，返回完整记录：
+    result: "1-0" (白胜), "0-1" (黑胜), "1/2-1/2" (平局)
+    moves / comments: 每步的 UCI 走法及注释 (分数、深度、节点、用时)
+    seed: 给定时本局的随机性 (RandomAI、走法排序中的随机扰动) 完全由它决定
+    start_fen: 开局局面 (默认标准初始局面)
+    time_control: (基础秒数, 每步加秒)；给定时双方用棋钟计时，超时判负，
+                  记录中增加每步用时 move_times 和剩余时间 clock_left
+    adjudication: Adjudicator 的阈值字典；给定时满足认输/和棋条件即提前结束，
+                  termination 为 "adjudication"，原因记在 record["adjudication"]
     """
-    board = chess.Board()
-    
-    # 实例化 AI (每次必须重新实例化以清空置换表/缓存)
-    white_player = create_ai(white_ai_name, True)
-    black_player = create_ai(black_ai_name, False)
-    
+    if seed is not None:
+        random.seed(seed)
+
+    # 从引擎池取出 AI (复用实例，置换表/缓存在 new_game 中清空)
+    timed = time_control is not None
+    setup_start = time.time()
+    white_player = acquire_ai(white_ai_name, True, seed, timed)
+    black_player = acquire_ai(black_ai_name, False, None if seed is None else seed + 1, timed)
+    setup_seconds = time.time() - setup_start
+
+    clock = ChessClock(*time_control) if timed else None
+    game = ChessGame(white_player, black_player, clock=clock, start_fen=start_fen)
+    board = game.board
+    adjudicator = None
+    if adjudication is not None:
+        adjudicator = Adjudicator(**adjudication)
+
+    record = {"start_fen": start_fen, "moves": [], "comments": [], "termination": "normal",
+              "setup_seconds": setup_seconds}
     move_count = 0
-    
-    while not board.is_game_over() and move_count < max_moves:
+    game_start = time.time()
+
+    while not game.is_game_over() and move_count < max_moves:
         # 轮流走棋
-        player = white_player if board.turn else black_player
-        
+        color = board.turn
+        player = white_player if color else black_player
+
         try:
-            # 使用上下文管理器隐藏 AI 内部的 print 输出
-            with HiddenPrints():
-                move = player.choose_move(board)
-            
-            board.push(move)
+            move_start = time.time()
+            move = game.make_move()
+            if move is None:
+                break  # 超时
+
+            record["moves"].append(move.uci())
+            record["comments"].append(move_comment(player, time.time() - move_start,
+                                                   clock.remaining[color] if timed else None))
             move_count += 1
+
+            if adjudicator is not None:
+                verdict = adjudicator.update(board, color, reported_score(player))
+                if verdict:
+                    record["result"], record["adjudication"] = verdict
+                    record["termination"] = "adjudication"
+                    break
         except Exception as e:
             # 如果 AI 出错（例如超时或崩溃），判负
             # print(f"Error in game: {e}")
-            return "0-1" if board.turn else "1-0"
+            record["result"] = "0-1" if board.turn else "1-0"
+            record["termination"] = f"engine error: {e}"
+            record["seconds"] = time.time() - game_start
+            if timed:
+                add_clock_stats(record, clock)
+            if adjudicator is not None:
+                adjudicator.close()
+            return record
 
-    # 游戏结束判定
-    result = board.result()
-    
-    # 如果达到最大步数强制平局（防止 Random vs Random 死循环）
-    if move_count >= max_moves and result == "*":
-        return "1/2-1/2"
-        
-    return result
+    if adjudicator is not None:
+        adjudicator.close()
 
-# --- 评测逻辑 ---
-def evaluate_matchup(matchup_name, white_name, black_name, num_games):
-    print(f"正在进行测试: {matchup_name} [{white_name} vs {black_name}] (共 {num_games} 局)...")
-    
-    white_wins = 0
-    black_wins = 0
-    draws = 0
-    
-    # 进度条效果
-    for i in range(num_games):
-        print(f"\r  进度: {i+1}/{num_games}", end="", flush=True)
-        result = play_single_game(white_name, black_name)
-        
-        if result == "1-0":
-            white_wins += 1
-        elif result == "0-1":
-            black_wins += 1
-        else:
-            draws += 1
-            
+    if timed:
+        add_clock_stats(record, clock)
+        if game.is_flagged():
+            record["termination"] = "time forfeit"
+
+    # 游戏结束判定 (已被裁决的对局直接使用裁决结果)
+    if record["termination"] != "adjudication":
+        result = game.result()
+
+        # 如果达到最大步数强制平局（防止 Random vs Random 死循环）
+        if move_count >= max_moves and result == "*":
+            result = "1/2-1/2"
+            record["termination"] = "max moves"
+
+        record["result"] = result
+    record["seconds"] = time.time() - game_start
+    return record
+
+def play_single_game(white_ai_name, black_ai_name, max_moves=200, seed=None, start_fen=None, time_control=None) -> str:
+    """
+    运行一局游戏。
+    返回: "1-0" (白胜), "0-1" (黑胜), "1/2-1/2" (平局)
+    """
+    return play_game(white_ai_name, black_ai_name, max_moves, seed, start_fen, time_control)["result"]
+
+# --- 并行对局 ---
+def game_seed(matchup_name: str, game_index: int) -> int:
+    """每局的随机种子只由对决名称和局号决定，与由哪个进程、以何种顺序执行无关"""
+    return zlib.crc32(f"{matchup_name}:{game_index}".encode())
+
+def play_game_task(task) -> Tuple[str, int, str, dict]:
+    """
+    工作进程执行的单局任务，返回 (对决名, 局号, A 视角结果, 对局记录)。
+    A 视角结果："1-0" 表示 A 胜，无论 A 执白还是执黑。
+    任务最后一项是传给 play_game 的对局选项 (如 time_control)。
+    """
+    matchup_name, game_index, a_name, b_name, start_fen, a_is_white, game_options = task
+    seed = game_seed(matchup_name, game_index)
+    if a_is_white:
+        record = play_game(a_name, b_name, seed=seed, start_fen=start_fen, **game_options)
+        result = record["result"]
+    else:
+        record = play_game(b_name, a_name, seed=seed, start_fen=start_fen, **game_options)
+        result = {"1-0": "0-1", "0-1": "1-0"}.get(record["result"], record["result"])
+    return matchup_name, game_index, result, record
+
+def build_tasks(test_cases, num_games, openings=None, swap_colors=False, game_options=None):
+    """
+    生成对局任务。给定开局列表时，第 2k 与 2k+1 局使用同一开局并交换执子颜色，
+    两局相邻提交，在进程池中同时进行。swap_colors 为 True 时没有开局也轮换颜色。
+    game_options: 每局都传给 play_game 的关键字参数 (如 {"time_control": (60, 0.5)})
+    """
+    game_options = game_options or {}
+    tasks = []
+    for name, a_name, b_name in test_cases:
+        for i in range(num_games):
+            if openings:
+                start_fen = openings[(i // 2) % len(openings)]
+                tasks.append((name, i, a_name, b_name, start_fen, i % 2 == 0, game_options))
+            else:
+                tasks.append((name, i, a_name, b_name, None, i % 2 == 0 if swap_colors else True, game_options))
+    return tasks
+
+def tournament_pairings(engines, gauntlet=False):
+    """
+    循环赛：所有引擎两两对决；gauntlet：第一个引擎依次对决其余引擎。
+    返回与 test_cases 相同格式的 [(对决名, A, B)]。
+    """
+    if gauntlet:
+        pairs = [(engines[0], other) for other in engines[1:]]
+    else:
+        pairs = list(combinations(engines, 2))
+    return [(f"{a} vs {b}", a, b) for a, b in pairs]
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+def task_config(task) -> str:
+    """
+    对局配置指纹：双方引擎配置、起始局面、执子颜色与对局选项 (限时、判定规则等)。
+    日志中的结果只有在指纹相同时才能复用
+    """
+    matchup_name, game_index, a_name, b_name, start_fen, a_is_white, game_options = task
+    config = json.dumps([a_name, b_name, start_fen, a_is_white, game_options], sort_keys=True)
+    return f"{zlib.crc32(config.encode()):08x}"
+
+class ResultLog:
+    """
+    断点续跑日志：每局结束立即追加到 games.pgn (带逐步注释) 和 results.jsonl。
+    results.jsonl 是已完成对局的依据；重启时读取它并跳过这些对局。
+    每行记录对局配置指纹 (task_config)；换了开局文件、限时或引擎选项后重跑到同一目录时，
+    配置不同的旧记录被忽略，对应的对局重下。
+    先写 PGN 再写 JSONL，若恰好在两者之间被中断，该局会重下并在 PGN 中出现两次。
+    """
+
+    def __init__(self, output_dir: str):
+        os.makedirs(output_dir, exist_ok=True)
+        self.pgn_path = os.path.join(output_dir, "games.pgn")
+        self.jsonl_path = os.path.join(output_dir, "results.jsonl")
+        self.done = {}  # (对决名, 局号, 配置指纹) -> 日志行
+        self.logged = set()  # 日志中出现过的 (对决名, 局号)，不论配置
+        if os.path.exists(self.jsonl_path):
+            with open(self.jsonl_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 中断时写了一半的行
+                    self.done[(entry["matchup"], entry["game"], entry.get("config"))] = entry
+                    self.logged.add((entry["matchup"], entry["game"]))
+
+    def entry(self, task):
+        """该任务在日志中的记录 (配置相同时)，否则为 None"""
+        return self.done.get((task[0], task[1], task_config(task)))
+
+    def is_done(self, task) -> bool:
+        return self.entry(task) is not None
+
+    def is_stale(self, task) -> bool:
+        """日志中有同一局的记录，但配置不同"""
+        return not self.is_done(task) and (task[0], task[1]) in self.logged
+
+    def record(self, task, result: str, record: dict):
+        matchup_name, game_index, a_name, b_name, start_fen, a_is_white, game_options = task
+        white, black = (a_name, b_name) if a_is_white else (b_name, a_name)
+        time_control = game_options.get("time_control")
+
+        game = chess.pgn.Game()
+        if start_fen:
+            game.setup(chess.Board(start_fen))
+        game.headers["Event"] = matchup_name
+        game.headers["Round"] = str(game_index + 1)
+        game.headers["White"] = white
+        game.headers["Black"] = black
+        game.headers["Result"] = record["result"]
+        game.headers["Termination"] = record["termination"]
+        if "adjudication" in record:
+            game.headers["Adjudication"] = record["adjudication"]
+        if time_control:
+            game.headers["TimeControl"] = f"{time_control[0]:g}+{time_control[1]:g}"
+        node = game
+        for uci, comment in zip(record["moves"], record["comments"]):
+            node = node.add_variation(chess.Move.from_uci(uci), comment=comment)
+
+        with open(self.pgn_path, "a") as f:
+            print(game, file=f, end="\n\n")
+
+        entry = {
+            "matchup": matchup_name, "game": game_index, "config": task_config(task),
+            "player_a": a_name, "player_b": b_name,
+            "white": white, "black": black, "start_fen": start_fen, "result": record["result"],
+            "a_result": result, "termination": record["termination"],
+            "plies": len(record["moves"]), "seconds": round(record["seconds"], 3),
+            "setup_seconds": round(record["setup_seconds"], 4),
+        }
+        if "adjudication" in record:
+            entry["adjudication"] = record["adjudication"]
+        if time_control:
+            entry["time_control"] = list(time_control)
+            entry["move_times"] = record["move_times"]
+            entry["clock_left"] = record["clock_left"]
+        with open(self.jsonl_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.done[(matchup_name, game_index, entry["config"])] = entry
+        self.logged.add((matchup_name, game_index))
+
+def run_games(tasks, workers, stopped=None, log=None):
+    """
+    将对局分发到进程池，按完成顺序逐局产出 (对决名, 局号, 结果, 对局概况)，
+    对局概况为 {"termination": 结束方式, "plies": 半回合数}，
+    同时显示实时进度与预计剩余时间。
+    stopped: 可选的对决名集合；调用方加入某个对决后，其尚未开始的对局被取消。
+    log: 可选的 ResultLog；其中已完成的对局直接产出记录中的结果，不再重下。
+    """
+    if log:
+        finished = [task for task in tasks if log.is_done(task)]
+        stale = sum(1 for task in tasks if log.is_stale(task))
+        tasks = [task for task in tasks if not log.is_done(task)]
+        if finished:
+            print(f"  从日志恢复 {len(finished)} 局，剩余 {len(tasks)} 局")
+        if stale:
+            print(f"  忽略日志中 {stale} 局配置不同 (开局、限时或引擎选项) 的记录，这些对局重下")
+        for task in finished:
+            entry = log.entry(task)
+            yield task[0], task[1], entry["a_result"], {"termination": entry["termination"], "plies": entry["plies"]}
+
+    start_time = time.time()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures = {executor.submit(play_game_task, task): task for task in tasks}
+    cancelled = set()
+    done = 0
+    try:
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            done += 1
+            matchup_name, game_index, result, record = future.result()
+            if log:
+                log.record(futures[future], result, record)
+
+            if stopped and not stopped <= cancelled:
+                for pending, task in futures.items():
+                    if task[0] in stopped and not pending.done():
+                        pending.cancel()
+                cancelled |= stopped
+
+            remaining = sum(1 for f in futures if not f.done())
+            elapsed = time.time() - start_time
+            eta = elapsed / done * remaining
+            print(f"\r  进度: {done}/{done + remaining} 局 | 已用 {format_duration(elapsed)} | "
+                  f"预计剩余 {format_duration(eta)}  ", end="", flush=True)
+            yield matchup_name, game_index, result, {"termination": record["termination"], "plies": len(record["moves"])}
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
     print(f" -> 完成")
-    
+
+def summarize_matchup(matchup_name, white_name, black_name, game_results, game_info=None):
+    """
+    汇总一组对决的结果；game_results 为 {局号: A 视角结果}，统计与完成顺序无关。
+    game_info: 可选的 {局号: 对局概况}，用于统计被裁决的局数与平均长度
+    """
+    num_games = len(game_results)
+    infos = [game_info[index] for index in game_results] if game_info else []
+    white_wins = sum(1 for r in game_results.values() if r == "1-0")
+    black_wins = sum(1 for r in game_results.values() if r == "0-1")
+    draws = num_games - white_wins - black_wins
+    elo, elo_error = elo_estimate(white_wins, draws, black_wins)
+
     return {
         "Matchup": matchup_name,
         "White": white_name,
         "Black": black_name,
+        "Games": num_games,
+        "A_Wins": white_wins,
+        "Draws": draws,
+        "B_Wins": black_wins,
         "A_Win_Pct": (white_wins / num_games) * 100,
         "Draw_Pct": (draws / num_games) * 100,
-        "B_Win_Pct": (black_wins / num_games) * 100
+        "B_Win_Pct": (black_wins / num_games) * 100,
+        "Elo": elo,
+        "Elo_Error": elo_error,
+        "Adjudicated": sum(1 for info in infos if info["termination"] == "adjudication"),
+        "Avg_Plies": sum(info["plies"] for info in infos) / len(infos) if infos else 0.0,
     }
 
+# --- 评测逻辑 ---
+def evaluate_matchup(matchup_name, white_name, black_name, num_games, workers=None, openings=None, log=None,
+                     game_options=None):
+    print(f"正在进行测试: {matchup_name} [{white_name} vs {black_name}] (共 {num_games} 局)...")
+    tasks = build_tasks([(matchup_name, white_name, black_name)], num_games, openings, game_options=game_options)
+    game_results, game_info = {}, {}
+    for _, index, result, info in run_games(tasks, workers, log=log):
+        game_results[index] = result
+        game_info[index] = info
+    return summarize_matchup(matchup_name, white_name, black_name, game_results, game_info)
+
+def run_all_matchups(test_cases, num_games, workers=None, openings=None, log=None, swap_colors=False,
+                     game_options=None):
+    """所有对决的全部对局一次性提交到同一个进程池，保持所有核心满载"""
+    print(f"共 {len(test_cases)} 组对决, {len(test_cases) * num_games} 局, {workers or os.cpu_count()} 个进程")
+    tasks = build_tasks(test_cases, num_games, openings, swap_colors, game_options)
+
+    game_results = {name: {} for name, _, _ in test_cases}
+    game_info = {name: {} for name, _, _ in test_cases}
+    for matchup_name, index, result, info in run_games(tasks, workers, log=log):
+        game_results[matchup_name][index] = result
+        game_info[matchup_name][index] = info
+
+    return [summarize_matchup(name, white, black, game_results[name], game_info[name])
+            for name, white, black in test_cases]
+
+def result_score(result: str) -> float:
+    """Player A 的得分"""
+    return {"1-0": 1.0, "0-1": 0.0}.get(result, 0.5)
+
+def run_all_matchups_sprt(test_cases, max_games, workers=None, elo0=0.0, elo1=10.0, alpha=0.05, beta=0.05,
+                          openings=None, log=None, game_options=None, swap_colors=False):
+    """
+    SPRT 模式：每组对决最多 max_games 局，一旦检验得出结论立即停止该组并取消其余对局。
+    结果按局号顺序送入检验 (先完成的靠后局号会等待)，因此停止点与调度顺序无关。
+    使用开局列表 (或 swap_colors 轮换颜色) 时只在一对交换颜色的对局都计入后才判断是否停止。
+    """
+    print(f"SPRT: elo0={elo0} elo1={elo1} alpha={alpha} beta={beta}, 每组最多 {max_games} 局")
+    tasks = build_tasks(test_cases, max_games, openings, swap_colors, game_options)
+
+    tests = {name: SPRT(elo0, elo1, alpha, beta) for name, _, _ in test_cases}
+    pending = {name: {} for name, _, _ in test_cases}   # 已完成但尚未按序送入检验的对局
+    counted = {name: {} for name, _, _ in test_cases}   # 已计入检验的对局
+    game_info = {name: {} for name, _, _ in test_cases}
+    stopped = set()
+
+    for matchup_name, index, result, info in run_games(tasks, workers, stopped, log):
+        if matchup_name in stopped:
+            continue
+        pending[matchup_name][index] = result
+        game_info[matchup_name][index] = info
+        test = tests[matchup_name]
+        while test.games in pending[matchup_name]:
+            next_index = test.games
+            next_result = pending[matchup_name].pop(next_index)
+            counted[matchup_name][next_index] = next_result
+            test.add(result_score(next_result))
+            if (openings or swap_colors) and test.games % 2 == 1:
+                continue
+            if test.verdict() or test.games >= max_games:
+                stopped.add(matchup_name)
+                break
+
+    results = []
+    for name, white, black in test_cases:
+        stats = summarize_matchup(name, white, black, counted[name], game_info[name])
+        stats["SPRT"] = tests[name].verdict() or "-"
+        stats["LLR"] = tests[name].llr()
+        results.append(stats)
+    return results
+
+def print_results_table(results, num_games, swap_colors=False):
+    print("\n\n" + "="*90)
+    print(f"Table 1: Head-to-Head Win Rates ({num_games} Games)")
+    print("="*90)
+
+    # 表头 (交换颜色时 A/B 各执白一半)
+    player_a, player_b = ("Player A", "Player B") if swap_colors else ("White (Player A)", "Black (Player B)")
+    name_width = max([10] + [len(row['Matchup']) for row in results])
+    player_width = max([20] + [len(row[key]) for row in results for key in ('White', 'Black')])
+    header = (f"{'Matchup':<{name_width}} | {player_a:<{player_width}} | {player_b:<{player_width}} | "
+              f"{'A Win %':<8} | {'Draw %':<8} | {'B Win %':<8} | {'Adjud.':>6} | {'Avg Plies':>9}")
+    print(header)
+    print("-" * len(header))
+
+    # 数据行
+    for row in results:
+        print(f"{row['Matchup']:<{name_width}} | "
+              f"{row['White']:<{player_width}} | "
+              f"{row['Black']:<{player_width}} | "
+              f"{row['A_Win_Pct']:>6.1f}% | "
+              f"{row['Draw_Pct']:>6.1f}% | "
+              f"{row['B_Win_Pct']:>6.1f}% | "
+              f"{row['Adjudicated']:>6} | "
+              f"{row['Avg_Plies']:>9.1f}")
+
+    print("="*90)
+
+def print_elo_table(results, sprt_bounds=None):
+    """打印每组对决的局数、Elo 估计 (95% 误差范围)，以及 SPRT 结论"""
+    print("\n" + "="*90)
+    print("Table 2: Elo Estimates (Player A vs Player B)")
+    print("="*90)
+    name_width = max([10] + [len(row['Matchup']) for row in results])
+    header = f"{'Matchup':<{name_width}} | {'Games':>5} | {'Elo':>8} | {'± 95%':>8}"
+    if sprt_bounds:
+        header += f" | {'LLR':>7} | {'Bounds':<15} | {'Verdict':<7}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        line = f"{row['Matchup']:<{name_width}} | {row['Games']:>5} | {row['Elo']:>8.1f} | {row['Elo_Error']:>8.1f}"
+        if sprt_bounds:
+            bounds = f"[{sprt_bounds[0]:.2f}, {sprt_bounds[1]:.2f}]"
+            line += f" | {row['LLR']:>7.2f} | {bounds:<15} | {row['SPRT']:<7}"
+        print(line)
+    print("="*90)
+
+def print_crosstable(engines, results):
+    """
+    打印交叉表 (行引擎对列引擎的得分) 与按拟合 Elo 排序的排名表。
+    results 为 run_all_matchups 的返回值。
+    """
+    pair_results = {}
+    for row in results:
+        pair_results[(row["White"], row["Black"])] = (row["A_Wins"], row["Draws"], row["B_Wins"])
+    ratings = fit_ratings(pair_results)
+
+    # 每个引擎的总战绩
+    totals = {engine: [0, 0, 0] for engine in engines}
+    cells = {}
+    for (a, b), (wins, draws, losses) in pair_results.items():
+        totals[a] = [totals[a][0] + wins, totals[a][1] + draws, totals[a][2] + losses]
+        totals[b] = [totals[b][0] + losses, totals[b][1] + draws, totals[b][2] + wins]
+        cells[(a, b)] = f"{wins + 0.5 * draws:g}/{wins + draws + losses}"
+        cells[(b, a)] = f"{losses + 0.5 * draws:g}/{wins + draws + losses}"
+
+    ranked = sorted(engines, key=lambda e: ratings.get(e, 0.0), reverse=True)
+    labels = {engine: str(i + 1) for i, engine in enumerate(ranked)}
+    name_width = max(len(e) for e in engines) + 2
+
+    print("\n" + "="*90)
+    print("Crosstable (row score vs column)")
+    print("="*90)
+    header = f"{'#':>2} {'Engine':<{name_width}} | {'Elo':>7} | {'± 95%':>7} | {'Score':>9} |" + "".join(f" {labels[e]:>7}" for e in ranked)
+    print(header)
+    print("-" * len(header))
+    for engine in ranked:
+        wins, draws, losses = totals[engine]
+        _, error = elo_estimate(wins, draws, losses)
+        score = f"{wins + 0.5 * draws:g}/{wins + draws + losses}"
+        line = f"{labels[engine]:>2} {engine:<{name_width}} | {ratings.get(engine, 0.0):>7.1f} | {error:>7.1f} | {score:>9} |"
+        for opponent in ranked:
+            line += f" {'-' if opponent == engine else cells.get((engine, opponent), ''):>7}"
+        print(line)
+    print("="*90)
+
 # --- 主程序 ---
 if __name__ == "__main__":
     # 定义测试配置
@@ -116,40 +606,93 @@ if __name__ == "__main__":
         ("Test 3", "BetterAlphaBeta", "ID-Minimax"),
         ("Test 4", "NeuralNetAI", "RandomAI")
     ]
-    
+
     TOTAL_GAMES_PER_MATCH = 50  # 每组对决的局数
-    results = []
+
+    parser = argparse.ArgumentParser(description="Automated AI vs AI matches")
+    parser.add_argument("--games", type=int, default=TOTAL_GAMES_PER_MATCH, help='Games per matchup')
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument("--sprt", action='store_true', help='Stop each matchup early once the SPRT reaches a verdict (--games is the cap)')
+    parser.add_argument("--elo0", type=float, default=0.0, help='SPRT null hypothesis Elo difference')
+    parser.add_argument("--elo1", type=float, default=10.0, help='SPRT alternative hypothesis Elo difference')
+    parser.add_argument("--alpha", type=float, default=0.05, help='SPRT false positive rate')
+    parser.add_argument("--beta", type=float, default=0.05, help='SPRT false negative rate')
+    parser.add_argument("--openings", type=str, default=None, help='EPD or PGN opening file; each opening is played twice with colors swapped')
+    parser.add_argument("--random-openings", type=int, default=0, help='Generate this many random balanced openings instead of an opening file')
+    parser.add_argument("--opening-plies", type=int, default=8, help='Plies per random opening')
+    parser.add_argument("--output-dir", type=str, default=None, help='Append games to <dir>/games.pgn and <dir>/results.jsonl; rerunning resumes from them')
+    parser.add_argument("--round-robin", nargs="+", metavar="ENGINE", default=None,
+                        help=f'Play every pair of these engine specs, e.g. BetterAlphaBeta:depth=4 (registered: {", ".join(REGISTERED_ENGINES)})')
+    parser.add_argument("--gauntlet", nargs="+", metavar="ENGINE", default=None,
+                        help='Play the first engine spec against each of the others')
+    parser.add_argument("--adjudicate", action='store_true', help='End hopeless and dead-drawn games early (thresholds below)')
+    parser.add_argument("--resign-score", type=int, default=DEFAULT_ADJUDICATION["resign_score"],
+                        help='Resign when both engines see one side down by at least this many centipawns')
+    parser.add_argument("--resign-moves", type=int, default=DEFAULT_ADJUDICATION["resign_moves"],
+                        help='...for this many consecutive moves of each engine')
+    parser.add_argument("--draw-score", type=int, default=DEFAULT_ADJUDICATION["draw_score"],
+                        help='Adjudicate a draw when both engines stay within +/- this many centipawns')
+    parser.add_argument("--draw-moves", type=int, default=DEFAULT_ADJUDICATION["draw_moves"],
+                        help='...for this many consecutive moves of each engine')
+    parser.add_argument("--draw-start", type=int, default=DEFAULT_ADJUDICATION["draw_start"],
+                        help='Earliest move number for score-based draw adjudication')
+    parser.add_argument("--syzygy", type=str, default=None, help='Syzygy tablebase directory for endgame adjudication')
+    parser.add_argument("--tc", type=str, default=None, metavar="BASE+INC",
+                        help='Time control in seconds, e.g. 10+0.1; engines without an explicit depth search until their clock budget runs out')
+    args = parser.parse_args()
+
+    game_options = {}
+    if args.tc:
+        clock = ChessClock.parse(args.tc)
+        game_options["time_control"] = (clock.base_seconds, clock.increment)
+    if args.adjudicate:
+        game_options["adjudication"] = dict(DEFAULT_ADJUDICATION, resign_score=args.resign_score,
+                                            resign_moves=args.resign_moves, draw_score=args.draw_score,
+                                            draw_moves=args.draw_moves, draw_start=args.draw_start,
+                                            syzygy=args.syzygy)
+
+    tournament_engines = args.round_robin or args.gauntlet
+    if tournament_engines:
+        for spec in tournament_engines:
+            parse_engine_spec(spec)  # 提前检查配置是否合法
+        test_cases = tournament_pairings(tournament_engines, gauntlet=bool(args.gauntlet))
+
+    log = ResultLog(args.output_dir) if args.output_dir else None
+
+    openings = None
+    if args.openings:
+        openings = load_openings(args.openings)
+    elif args.random_openings:
+        openings = random_balanced_openings(args.random_openings, plies=args.opening_plies)
+    if openings:
+        print(f"开局: {len(openings)} 个, 每个开局交换颜色各下一局")
 
     print("=== 开始自动化对战测试 ===")
-    print(f"每组对决局数: {TOTAL_GAMES_PER_MATCH}")
+    print(f"每组对决局数: {args.games}")
+    if args.tc:
+        print(f"限时: {args.tc} (基础秒数+每步加秒)")
     print("注意: 复杂的 AI (如 AlphaBeta) 思考时间较长，请耐心等待。\n")
 
     start_time = time.time()
 
-    for test_name, white, black in test_cases:
-        stats = evaluate_matchup(test_name, white, black, TOTAL_GAMES_PER_MATCH)
-        results.append(stats)
+    # 锦标赛模式下没有开局文件时也轮换执子颜色
+    if args.sprt:
+        results = run_all_matchups_sprt(test_cases, args.games, args.workers,
+                                        args.elo0, args.elo1, args.alpha, args.beta, openings, log, game_options,
+                                        swap_colors=bool(tournament_engines))
+    else:
+        results = run_all_matchups(test_cases, args.games, args.workers, openings, log,
+                                   swap_colors=bool(tournament_engines), game_options=game_options)
 
     total_time = time.time() - start_time
-    
+
     # --- 打印表格 ---
-    print("\n\n" + "="*90)
-    print(f"Table 1: Head-to-Head Win Rates (50 Games)")
-    print("="*90)
-    
-    # 表头
-    header = f"{'Matchup':<10} | {'White (Player A)':<20} | {'Black (Player B)':<20} | {'A Win %':<8} | {'Draw %':<8} | {'B Win %':<8}"
-    print(header)
-    print("-" * len(header))
-    
-    # 数据行
-    for row in results:
-        print(f"{row['Matchup']:<10} | "
-              f"{row['White']:<20} | "
-              f"{row['Black']:<20} | "
-              f"{row['A_Win_Pct']:>6.1f}% | "
-              f"{row['Draw_Pct']:>6.1f}% | "
-              f"{row['B_Win_Pct']:>6.1f}%")
-              
-    print("="*90)
-    print(f"总耗时: {total_time:.2f} 秒")
\ No newline at end of file
+    print_results_table(results, args.games, swap_colors=bool(openings or tournament_engines))
+    if args.sprt:
+        sprt = SPRT(args.elo0, args.elo1, args.alpha, args.beta)
+        print_elo_table(results, (sprt.lower, sprt.upper))
+    else:
+        print_elo_table(results)
+    if tournament_engines:
+        print_crosstable(tournament_engines, results)
+    print(f"总耗时: {total_time:.2f} 秒")
@@ -4,6 +4,8 @@ import chess.polyglot
 import random
 import time
 from typing import Dict, List, Optional, Tuple
+from SearchControl import LIMIT_CHECK_INTERVAL, SearchAborted, move_deadline
+from SearchInfo import SearchInfo, progress_info
 
 # --- 棋子位置价值表 (基于 PeSTO 的简化版) ---
 MG_TABLES = {
@@ -92,6 +94,29 @@ class BetterAlphaBetaAI:
         self.tt: Dict[int, Tuple[int, int, int, Optional[chess.Move]]] = {} # Hash -> (depth, flag, score, move)
         self.killer_moves: Dict[int, List[chess.Move]] = {}
         self.history_heuristic: Dict[int, int] = {}
+        self.last_score: Optional[int] = None # 最近一次搜索的根节点分数 (相对当前走棋方)
+        self.last_depth = 0 # 最近一次搜索完整完成的深度
+        self.node_limit: Optional[int] = None # 节点数上限 (None 表示只按深度搜索)
+        self.null_move = True # 是否启用空着裁剪
+        self.stop_requested = False # 由 stop() 设置 (例如 GUI 的"立即走棋")
+        self.limit_check_interval = LIMIT_CHECK_INTERVAL # 每隔多少个节点检查一次限制
+        self.next_limit_check = sys.maxsize
+        self.clock = None # 对局棋钟 (由 ChessGame 设置)，有棋钟时按分配的时间搜索
+        self.deadline: Optional[float] = None
+        self.info_sink = None # 搜索信息输出 (见 SearchInfo)，为 None 时不发布逐层信息
+        self.last_info: Optional[SearchInfo] = None # 最近一次搜索的最终统计
+        self.progress_interval: Optional[float] = None # 设置后 (且有 info_sink) 搜索中每隔这么多秒发布一次进度
+        self.last_iteration: Optional[SearchInfo] = None # 本次搜索最近完成的一层
+        self.collect_stats = False # 没有 info_sink 时也统计 qnodes、选择性深度并取出完整主要变例
+        self.track_stats = False # 本次搜索是否统计 (collect_stats 或设置了 info_sink)
+        self.search_start = 0.0
+        self.next_progress = 0.0
+        # 搜索统计
+        self.qnodes = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
+        self.seldepth = 0
+        self.root_ply = 0
         
         self.mg_tables = self._init_tables(MG_TABLES)
         self.eg_tables = self._init_tables(MG_TABLES)
@@ -99,6 +124,16 @@ class BetterAlphaBetaAI:
         self.mg_tables_black = {k: self._flip_table(v) for k, v in self.mg_tables.items()}
         self.eg_tables_black = {k: self._flip_table(v) for k, v in self.eg_tables.items()}
 
+    def new_game(self):
+        """清空对局相关的状态 (置换表、杀手走法、历史表、棋钟)，以便同一实例连续下多局"""
+        self.tt.clear()
+        self.killer_moves.clear()
+        self.history_heuristic.clear()
+        self.last_score = None
+        self.last_depth = 0
+        self.last_info = None
+        self.clock = None
+
     def _init_tables(self, base_tables):
         return {k: list(v) for k, v in base_tables.items()}
 
@@ -111,13 +146,31 @@ class BetterAlphaBetaAI:
 
     def choose_move(self, board: chess.Board) -> chess.Move:
         self.nodes_visited = 0
+        self.qnodes = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
+        self.seldepth = 0
+        self.last_score = None
+        self.last_depth = 0
         best_move = None
         alpha = -sys.maxsize
         beta = sys.maxsize
         
         start_time = time.time()
+        root_ply = len(board.move_stack)
+        self.root_ply = root_ply
+        self.deadline = move_deadline(self.clock, board.turn, start_time)
+        # 搜索开始前 (线程已启动但还没进入 choose_move 时) 收到的停止请求在第一个节点生效
+        self.next_limit_check = 0 if self.stop_requested else min(self.limit_check_interval, self.node_limit or sys.maxsize)
+        self.search_start = start_time
+        self.next_progress = start_time + (self.progress_interval or 0)
+        self.last_iteration = None
+        self.track_stats = self.collect_stats or self.info_sink is not None
         
         for current_depth in range(1, self.depth + 1):
+            # 已用掉一半时间时，下一层大概率搜不完，不再加深
+            if self.deadline and best_move and time.time() - start_time > (self.deadline - start_time) / 2:
+                break
             try:
                 score = self.negamax(board, current_depth, alpha, beta, 1 if board.turn else -1, is_root=True)
                 
@@ -125,8 +178,17 @@ class BetterAlphaBetaAI:
                 tt_entry = self.tt.get(self.get_board_hash(board))
                 if tt_entry and tt_entry[3]:
                     best_move = tt_entry[3]
-                    print(f"Info: Depth {current_depth} score {score} move {best_move} nodes {self.nodes_visited}")
+                    self.last_score = score
+                    self.last_depth = current_depth
+                    if self.info_sink is not None:
+                        self.last_iteration = self.search_info(board, start_time)
+                        self.info_sink(self.last_iteration)
                 
+            except SearchAborted:
+                # 中止时搜索栈没有回退，恢复到根局面；使用上一层完整搜索的结果
+                while len(board.move_stack) > root_ply:
+                    board.pop()
+                break
             except Exception as e:
                 print(f"Error at depth {current_depth}: {e}")
                 import traceback
@@ -136,17 +198,71 @@ class BetterAlphaBetaAI:
         if not best_move:
             best_move = random.choice(list(board.legal_moves))
             
-        print(f"Stats: {self.nodes_visited} nodes in {time.time() - start_time:.2f}s")
-        # 在AlphaBetaAI的choose_move方法末尾添加
-        end_time = time.time()
-        elapsed_time = end_time - start_time  # 需在方法开始处记录start_time
-        nps = self.nodes_visited / elapsed_time if elapsed_time > 0 else 0
-        print(f"AlphaBetaAI NPS: {nps:.2f}")
-        # 可将结果存入日志或全局列表
+        self.last_info = self.search_info(board, start_time, final=True)
+        if self.info_sink is not None:
+            self.info_sink(self.last_info)
+        self.stop_requested = False  # 停止请求只作用于本次搜索
         return best_move
 
+    def search_info(self, board: chess.Board, start_time: float, final: bool = False) -> SearchInfo:
+        """当前搜索的统计信息 (主要变例从置换表中取出；不统计时只含根节点走法)"""
+        pv_length = max(self.last_depth, 1) if self.track_stats else 1
+        return SearchInfo(
+            engine=type(self).__name__, depth=self.last_depth, seldepth=self.seldepth, score=self.last_score,
+            pv=self.principal_variation(board, pv_length), nodes=self.nodes_visited,
+            qnodes=self.qnodes, tt_hits=self.tt_hits, cutoffs=self.cutoffs,
+            time=time.time() - start_time, final=final)
+
+    def principal_variation(self, board: chess.Board, max_length: int) -> List[chess.Move]:
+        """沿置换表中记录的最佳走法走下去，得到主要变例"""
+        pv = []
+        seen = set()
+        for _ in range(max_length):
+            board_hash = self.get_board_hash(board)
+            tt_entry = self.tt.get(board_hash)
+            if not tt_entry or not tt_entry[3] or board_hash in seen or not board.is_legal(tt_entry[3]):
+                break
+            seen.add(board_hash)
+            pv.append(tt_entry[3])
+            board.push(tt_entry[3])
+        for _ in pv:
+            board.pop()
+        return pv
+
+    def publish_progress(self):
+        """搜索进行中发布进度 (由 check_limits 调用，至多每 progress_interval 秒一次)"""
+        now = time.time()
+        if now < self.next_progress:
+            return
+        self.next_progress = now + self.progress_interval
+        self.info_sink(progress_info(
+            self.last_iteration, type(self).__name__, seldepth=self.seldepth, nodes=self.nodes_visited,
+            qnodes=self.qnodes, tt_hits=self.tt_hits, cutoffs=self.cutoffs, time=now - self.search_start))
+
+    def stop(self):
+        """
+        请求停止搜索 (可从其他线程调用)：下一个节点即中止，返回已完成的最深一层的最佳走法；
+        在搜索开始前调用同样有效，请求在本次搜索结束时清除
+        """
+        self.stop_requested = True
+        self.next_limit_check = 0
+
+    def check_limits(self):
+        """周期性检查搜索限制，超出时中止搜索"""
+        if self.stop_requested:
+            raise SearchAborted()
+        if self.node_limit and self.nodes_visited >= self.node_limit:
+            raise SearchAborted()
+        if self.deadline and time.time() >= self.deadline:
+            raise SearchAborted()
+        if self.progress_interval and self.info_sink is not None:
+            self.publish_progress()
+        self.next_limit_check = min(self.nodes_visited + self.limit_check_interval, self.node_limit or sys.maxsize)
+
     def negamax(self, board: chess.Board, depth: int, alpha: int, beta: int, turn_multiplier: int, is_root: bool = False) -> int:
         self.nodes_visited += 1
+        if self.nodes_visited >= self.next_limit_check:
+            self.check_limits()
         
         # --- 平局/结束判断 ---
         
@@ -167,6 +283,7 @@ class BetterAlphaBetaAI:
         tt_move = None
         
         if tt_entry:
+            self.tt_hits += 1
             tt_depth, tt_flag, tt_score, tt_move = tt_entry
             if tt_depth >= depth and not is_root:
                 if tt_flag == 0: # EXACT
@@ -184,11 +301,12 @@ class BetterAlphaBetaAI:
             return self.quiescence(board, alpha, beta, turn_multiplier)
 
         # --- 空着裁剪 (Null Move Pruning) ---
-        if depth >= 3 and not board.is_check() and not is_root:
+        if self.null_move and depth >= 3 and not board.is_check() and not is_root:
             board.push(chess.Move.null())
             score = -self.negamax(board, depth - 1 - 2, -beta, -beta + 1, -turn_multiplier)
             board.pop()
             if score >= beta:
+                self.cutoffs += 1
                 return beta
 
         # --- 生成与排序移动 ---
@@ -216,6 +334,7 @@ class BetterAlphaBetaAI:
                 
                 if alpha >= beta:
                     # 剪枝发生
+                    self.cutoffs += 1
                     if not board.is_capture(move):
                         self.update_killers(move, depth)
                         self.update_history(move, depth)
@@ -229,6 +348,13 @@ class BetterAlphaBetaAI:
 
     def quiescence(self, board: chess.Board, alpha: int, beta: int, turn_multiplier: int) -> int:
         self.nodes_visited += 1
+        if self.nodes_visited >= self.next_limit_check:
+            self.check_limits()
+        if self.track_stats:
+            self.qnodes += 1
+            ply = len(board.move_stack) - self.root_ply
+            if ply > self.seldepth:
+                self.seldepth = ply
         
         stand_pat = self.evaluate(board) * turn_multiplier
         
@@ -0,0 +1,279 @@
+# 棋盘渲染：基于 QGraphicsScene，格子与棋子图片只生成一次，之后只更新发生变化的格子
+# (取代每次点击都重新生成整张 chess.svg 棋盘并重新解析 SVG 的做法)
+import math
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+import chess
+import chess.svg
+from PyQt5.QtCore import QByteArray, QPointF, QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor, QPainter, QPainterPath, QPen, QPixmap, QPolygonF
+from PyQt5.QtSvg import QSvgRenderer
+from PyQt5.QtWidgets import (QGraphicsPathItem, QGraphicsPixmapItem, QGraphicsRectItem, QGraphicsScene,
+                             QGraphicsView)
+
+# 颜色与原先 chess.svg 棋盘一致
+LIGHT_SQUARE = '#f0d9b5'
+DARK_SQUARE = '#b58863'
+SELECTED_COLOR = '#ffcccc'      # 选中的棋子
+LAST_MOVE_COLOR = '#cdd16a'     # 上一步的起点与终点
+CHECK_COLOR = '#ff6666'         # 被将军的王
+TARGET_COLOR = '#15781b'        # 可走位置的 X 标记
+ARROW_COLOR = QColor(21, 120, 27, 160)  # 引擎当前最佳走法的箭头 (半透明)
+
+
+class FrameTimer:
+    """输入 (点击) 到对应重绘完成的延迟统计，单位毫秒"""
+
+    def __init__(self, history: int = 500):
+        self.latencies = deque(maxlen=history)
+        self._pending = None
+
+    def mark(self):
+        self._pending = time.perf_counter()
+
+    def cancel(self):
+        """输入没有引起任何变化，不会有对应的重绘"""
+        self._pending = None
+
+    def frame_done(self) -> Optional[float]:
+        """重绘完成时调用；有待测的输入时返回其延迟"""
+        if self._pending is None:
+            return None
+        latency = (time.perf_counter() - self._pending) * 1000
+        self._pending = None
+        self.latencies.append(latency)
+        return latency
+
+    def summary(self) -> Dict[str, float]:
+        if not self.latencies:
+            return {"count": 0, "mean": 0.0, "p95": 0.0, "max": 0.0}
+        ordered = sorted(self.latencies)
+        return {
+            "count": len(ordered),
+            "mean": sum(ordered) / len(ordered),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        }
+
+
+class BoardView(QGraphicsView):
+    """
+    棋盘视图：背景 (64 个格子) 画成一张图，每种棋子的图片按格子大小渲染一次并缓存；
+    set_position / set_selection 只修改与上次不同的格子。
+    点击格子时发出 square_clicked(格子编号)，重绘完成后发出 frame_drawn(点击到重绘的毫秒数)
+    """
+    square_clicked = pyqtSignal(int)
+    frame_drawn = pyqtSignal(float)
+
+    def __init__(self, size: int = 800, parent=None):
+        super().__init__(parent)
+        self.square_size = size / 8
+        self.frame_timer = FrameTimer()
+        self._dirty = False
+
+        scene = QGraphicsScene(0, 0, size, size, self)
+        scene.setItemIndexMethod(QGraphicsScene.NoIndex)  # 项目数固定且很少，不需要空间索引
+        self.setScene(scene)
+        self.setFixedSize(size, size)
+        self.setFrameShape(QGraphicsView.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setRenderHint(QPainter.SmoothPixmapTransform)
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+
+        scene.addItem(QGraphicsPixmapItem(self._render_board(size)))
+
+        # 每个格子固定一个高亮层、一个棋子、一个 X 标记，平时隐藏
+        self._highlight_items = []
+        self._piece_items = []
+        self._target_items = []
+        target_pen = QPen(QColor(TARGET_COLOR), max(2.0, self.square_size / 16))
+        for square in chess.SQUARES:
+            rect = self._square_rect(square)
+            highlight = QGraphicsRectItem(rect)
+            highlight.setPen(QPen(Qt.NoPen))
+            highlight.setZValue(1)
+            highlight.hide()
+            piece = QGraphicsPixmapItem()
+            piece.setPos(rect.topLeft())
+            piece.setZValue(2)
+            target = QGraphicsPathItem(self._cross_path(rect))
+            target.setPen(target_pen)
+            target.setZValue(3)
+            target.hide()
+            for item in (highlight, piece, target):
+                scene.addItem(item)
+            self._highlight_items.append(highlight)
+            self._piece_items.append(piece)
+            self._target_items.append(target)
+
+        self._arrow_item = QGraphicsPathItem()
+        self._arrow_item.setPen(QPen(Qt.NoPen))
+        self._arrow_item.setBrush(QBrush(ARROW_COLOR))
+        self._arrow_item.setZValue(4)
+        self._arrow_item.hide()
+        scene.addItem(self._arrow_item)
+        self._arrow: Optional[chess.Move] = None
+
+        self._piece_pixmaps: Dict[str, QPixmap] = {}
+        self._pieces: Dict[int, str] = {}        # 格子 -> 当前显示的棋子符号
+        self._highlights: Dict[int, str] = {}    # 格子 -> 当前高亮颜色
+        self._targets = set()
+        self._last_move: Optional[chess.Move] = None
+        self._check_square: Optional[int] = None
+        self._selected: Optional[int] = None
+
+    # --- 一次性生成的图片 ---
+
+    def _square_rect(self, square: int) -> QRectF:
+        s = self.square_size
+        return QRectF(chess.square_file(square) * s, (7 - chess.square_rank(square)) * s, s, s)
+
+    def _cross_path(self, rect: QRectF) -> QPainterPath:
+        margin = rect.width() * 0.35
+        inner = rect.adjusted(margin, margin, -margin, -margin)
+        path = QPainterPath()
+        path.moveTo(inner.topLeft())
+        path.lineTo(inner.bottomRight())
+        path.moveTo(inner.topRight())
+        path.lineTo(inner.bottomLeft())
+        return path
+
+    def _render_board(self, size: int) -> QPixmap:
+        pixmap = QPixmap(size, size)
+        painter = QPainter(pixmap)
+        for square in chess.SQUARES:
+            light = (chess.square_file(square) + chess.square_rank(square)) % 2 == 1
+            painter.fillRect(self._square_rect(square), QColor(LIGHT_SQUARE if light else DARK_SQUARE))
+        painter.end()
+        return pixmap
+
+    def _piece_pixmap(self, symbol: str) -> QPixmap:
+        """棋子图片 (chess.svg 的棋子造型) 按格子大小渲染一次后缓存"""
+        pixmap = self._piece_pixmaps.get(symbol)
+        if pixmap is None:
+            size = int(self.square_size)
+            svg = chess.svg.piece(chess.Piece.from_symbol(symbol), size=size)
+            renderer = QSvgRenderer(QByteArray(svg.encode('utf-8')))
+            pixmap = QPixmap(size, size)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            renderer.render(painter)
+            painter.end()
+            self._piece_pixmaps[symbol] = pixmap
+        return pixmap
+
+    # --- 增量更新 ---
+
+    def set_position(self, board: chess.Board, last_move: Optional[chess.Move] = None):
+        """显示局面；只有棋子变化的格子被重新设置 (last_move 默认取棋盘的最后一步)"""
+        if last_move is None and board.move_stack:
+            last_move = board.peek()
+        pieces = {square: piece.symbol() for square, piece in board.piece_map().items()}
+        for square in set(self._pieces) | set(pieces):
+            symbol = pieces.get(square)
+            if symbol == self._pieces.get(square):
+                continue
+            item = self._piece_items[square]
+            if symbol is None:
+                item.setPixmap(QPixmap())
+            else:
+                item.setPixmap(self._piece_pixmap(symbol))
+            self._dirty = True
+        self._pieces = pieces
+        self._last_move = last_move
+        self._check_square = board.king(board.turn) if board.is_check() else None
+        self._update_highlights()
+
+    def set_selection(self, square: Optional[int] = None, targets: Iterable[int] = ()):
+        """选中的格子与其可走位置 (X 标记)；square 为 None 时清除"""
+        self._selected = square
+        targets = set(targets)
+        for target in targets ^ self._targets:
+            self._target_items[target].setVisible(target in targets)
+            self._dirty = True
+        self._targets = targets
+        self._update_highlights()
+
+    def set_arrow(self, move: Optional[chess.Move]):
+        """在走法的起点与终点之间画箭头 (例如引擎当前的最佳走法)；None 时隐藏"""
+        if move == self._arrow:
+            return
+        self._arrow = move
+        if move is None:
+            self._arrow_item.hide()
+        else:
+            self._arrow_item.setPath(self._arrow_path(move))
+            self._arrow_item.show()
+        self._dirty = True
+
+    def _arrow_path(self, move: chess.Move) -> QPainterPath:
+        start = self._square_rect(move.from_square).center()
+        end = self._square_rect(move.to_square).center()
+        dx, dy = end.x() - start.x(), end.y() - start.y()
+        length = math.hypot(dx, dy)
+        ux, uy = dx / length, dy / length   # 方向
+        nx, ny = -uy, ux                    # 法向
+        s = self.square_size
+        shaft, head_width, head_length = s * 0.08, s * 0.25, s * 0.4
+        neck = QPointF(end.x() - ux * head_length, end.y() - uy * head_length)
+        points = [
+            QPointF(start.x() + nx * shaft, start.y() + ny * shaft),
+            QPointF(neck.x() + nx * shaft, neck.y() + ny * shaft),
+            QPointF(neck.x() + nx * head_width, neck.y() + ny * head_width),
+            end,
+            QPointF(neck.x() - nx * head_width, neck.y() - ny * head_width),
+            QPointF(neck.x() - nx * shaft, neck.y() - ny * shaft),
+            QPointF(start.x() - nx * shaft, start.y() - ny * shaft),
+        ]
+        path = QPainterPath()
+        path.addPolygon(QPolygonF(points))
+        path.closeSubpath()
+        return path
+
+    def _update_highlights(self):
+        highlights = {}
+        if self._last_move:
+            highlights[self._last_move.from_square] = LAST_MOVE_COLOR
+            highlights[self._last_move.to_square] = LAST_MOVE_COLOR
+        if self._check_square is not None:
+            highlights[self._check_square] = CHECK_COLOR
+        if self._selected is not None:
+            highlights[self._selected] = SELECTED_COLOR
+        for square in set(self._highlights) | set(highlights):
+            color = highlights.get(square)
+            if color == self._highlights.get(square):
+                continue
+            item = self._highlight_items[square]
+            if color is None:
+                item.hide()
+            else:
+                item.setBrush(QBrush(QColor(color)))
+                item.show()
+            self._dirty = True
+        self._highlights = highlights
+
+    # --- 输入与重绘计时 ---
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        point = self.mapToScene(event.pos())
+        file = int(point.x() // self.square_size)
+        rank = 7 - int(point.y() // self.square_size)
+        if not (0 <= file < 8 and 0 <= rank < 8):
+            return
+        self.frame_timer.mark()
+        self._dirty = False
+        self.square_clicked.emit(chess.square(file, rank))
+        if not self._dirty:
+            self.frame_timer.cancel()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        latency = self.frame_timer.frame_done()
+        if latency is not None:
+            self.frame_drawn.emit(latency)
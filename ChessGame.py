@@ -1,19 +1,80 @@
 
+import time
 import chess
 
 
+class ChessClock:
+    """Per-side game clock for a base + increment time control (seconds)."""
+
+    def __init__(self, base_seconds, increment=0.0):
+        self.base_seconds = base_seconds
+        self.increment = increment
+        self.remaining = {chess.WHITE: float(base_seconds), chess.BLACK: float(base_seconds)}
+        self.move_times = {chess.WHITE: [], chess.BLACK: []}
+        self.flagged = None  # color that ran out of time, if any
+        self._turn_start = None
+
+    @staticmethod
+    def parse(text):
+        """Parse a time control such as "60+0.5" (base+increment) or "300"."""
+        base, _, increment = text.partition("+")
+        return ChessClock(float(base), float(increment or 0))
+
+    def time_for_move(self, color, moves_to_go=30):
+        """Suggested budget for the next move: an even share of the remaining time plus most of the increment."""
+        remaining = self.remaining[color]
+        budget = remaining / moves_to_go + self.increment * 0.75
+        return max(min(budget, remaining * 0.5), 0.001)
+
+    def start(self, color):
+        self._turn_start = time.perf_counter()
+
+    def stop(self, color):
+        """Stop the running clock, record the move time; returns False on flag-fall."""
+        elapsed = time.perf_counter() - self._turn_start
+        self.move_times[color].append(elapsed)
+        self.remaining[color] -= elapsed
+        if self.remaining[color] < 0:
+            self.flagged = color
+            return False
+        self.remaining[color] += self.increment
+        return True
+
+
 class ChessGame:
-    def __init__(self, player1, player2):
-        self.board = chess.Board()
+    def __init__(self, player1, player2, clock=None, start_fen=None):
+        self.board = chess.Board(start_fen) if start_fen else chess.Board()
         self.players = [player1, player2]
+        # engines that manage their time read the clock from their own `clock` attribute
+        self.clock = clock
+        if clock is not None:
+            for player in self.players:
+                player.clock = clock
 
     def make_move(self):
         player = self.players[1 - int(self.board.turn)]
+        if self.clock is not None:
+            self.clock.start(self.board.turn)
         move = player.choose_move(self.board)
+        if self.clock is not None and not self.clock.stop(self.board.turn):
+            return None  # flag fell, the move is not played
         self.board.push(move)  # Make the move
+        return move
 
     def is_game_over(self):
-        return self.board.is_game_over()
+        return self.board.is_game_over() or self.is_flagged()
+
+    def is_flagged(self):
+        return self.clock is not None and self.clock.flagged is not None
+
+    def result(self):
+        # flag-fall loses, unless the opponent has no mating material left
+        if self.is_flagged():
+            loser = self.clock.flagged
+            if self.board.has_insufficient_material(not loser):
+                return "1/2-1/2"
+            return "0-1" if loser == chess.WHITE else "1-0"
+        return self.board.result()
 
     # added this terminal states handler to give better information at the end of a game as well as quit when a
     # terminal state was reached
@@ -30,32 +30,53 @@ def board_to_matrix(board):
             
     return matrix
 
-def get_dataset_from_pgn(pgn_file_path, max_games=100):
+def result_to_label(result):
+    """将 PGN 结果字符串转换为标签 (1=白胜, -1=黑胜, 0=和棋)"""
+    if result == "1-0":
+        return 1.0
+    elif result == "0-1":
+        return -1.0
+    return 0.0 # 平局
+
+def iter_pgn_games(f, max_games=None, offsets=None):
+    """
+    逐局读取已打开的 PGN 文件。
+    给定 offsets (由 PgnIndex.py 筛选得到) 时直接跳到这些对局，其余对局不做解析。
+    """
+    import chess.pgn
+
+    if offsets is not None:
+        for offset in offsets[:max_games]:
+            f.seek(offset)
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            yield game
+        return
+
+    count = 0
+    while max_games is None or count < max_games:
+        game = chess.pgn.read_game(f)
+        if game is None:
+            break
+        yield game
+        count += 1
+
+def get_dataset_from_pgn(pgn_file_path, max_games=100, offsets=None):
     """
     解析 PGN 文件生成训练数据 (这是一个简化的生成器)
     X: 棋盘矩阵
     Y: 结果 (1=白胜, -1=黑胜, 0=和棋)
+    offsets: 可选，只解析这些偏移量处的对局
     """
-    import chess.pgn
-    
     inputs = []
     labels = []
     
     with open(pgn_file_path) as f:
         count = 0
-        while count < max_games:
-            game = chess.pgn.read_game(f)
-            if game is None:
-                break
-            
+        for game in iter_pgn_games(f, max_games, offsets):
             # 解析结果
-            result = game.headers["Result"]
-            if result == "1-0":
-                y = 1.0
-            elif result == "0-1":
-                y = -1.0
-            else:
-                y = 0.0 # 平局
+            y = result_to_label(game.headers["Result"])
                 
             board = game.board()
             for move in game.mainline_moves():
@@ -67,4 +88,45 @@ def get_dataset_from_pgn(pgn_file_path, max_games=100):
             count += 1
             print(f"Parsed game {count}", end='\r')
             
-    return np.array(inputs), np.array(labels)
\ No newline at end of file
+    return np.array(inputs), np.array(labels)
+
+def iter_pgn_positions(pgn_file_path, max_games=None, offsets=None):
+    """
+    流式遍历 PGN 中每一步之后的局面，不在内存中累积数据。
+    产出 (board, y)：board 为同一个对象，下一次迭代时会被继续走子，
+    调用方如需保留请自行 copy()。
+    offsets: 可选，只解析这些偏移量处的对局
+    """
+    with open(pgn_file_path) as f:
+        count = 0
+        for game in iter_pgn_games(f, max_games, offsets):
+            y = result_to_label(game.headers["Result"])
+            board = game.board()
+            for move in game.mainline_moves():
+                board.push(move)
+                yield board, y
+
+            count += 1
+            print(f"Parsed game {count}", end='\r')
+
+# 数据集文件格式 (CSV)：每行一个局面
+# fen: 局面, label: 标签 (去重后为平均结果), count: 该局面出现次数
+DATASET_FIELDS = ['fen', 'label', 'count']
+
+def load_dataset(dataset_path, label_column='label'):
+    """
+    读取 CSV 数据集文件，返回 (X, Y)。
+    X: 棋盘矩阵, Y: label_column 指定的标签列
+    """
+    import csv
+
+    inputs = []
+    labels = []
+    with open(dataset_path, newline='') as f:
+        for row in csv.DictReader(f):
+            if row.get(label_column) in (None, ''):
+                continue
+            inputs.append(board_to_matrix(chess.Board(row['fen'])))
+            labels.append(float(row[label_column]))
+
+    return np.array(inputs), np.array(labels)
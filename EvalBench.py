@@ -0,0 +1,189 @@
+import argparse
+import json
+import random
+import sys
+import time
+import chess
+import numpy as np
+from typing import Callable, Dict, List
+
+from ChessAI import ChessAI
+from AlphaBetaAI import AlphaBetaAI
+from BetterAlphaBetaAI import BetterAlphaBetaAI
+from IterativeDeepeningMinimaxAI import IterativeDeepeningMinimaxAI
+
+# 每轮计时前重置随机种子：部分评估函数带随机扰动，固定种子后分数可以逐个比对
+EVAL_SEED = 20240601
+
+EVALUATOR_NAMES = [
+    "ChessAI.heuristic_eval",
+    "AlphaBetaAI.advanced_evaluation",
+    "IterativeDeepeningMinimaxAI.enhanced_evaluation",
+    "BetterAlphaBetaAI.evaluate",
+    "NeuralNetAI.single",
+    "NeuralNetAI.batched",
+]
+
+
+def load_positions(path: str, count: int = None) -> List[str]:
+    """读取 FEN 或 EPD 文件 (每行一个局面)"""
+    fens = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                board = chess.Board(line)
+            except ValueError:
+                board, _ = chess.Board.from_epd(line)
+            fens.append(board.fen())
+            if count and len(fens) >= count:
+                break
+    return fens
+
+
+def random_positions(count: int, seed: int = 0, max_plies: int = 80) -> List[str]:
+    """随机对局中随机取一个局面，覆盖开局、中局和残局"""
+    rng = random.Random(seed)
+    fens = []
+    while len(fens) < count:
+        board = chess.Board()
+        for _ in range(rng.randint(1, max_plies)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        if not board.is_game_over():
+            fens.append(board.fen())
+    return fens
+
+
+def create_evaluator(name: str) -> Callable[[List[chess.Board]], List[float]]:
+    """返回对一组局面逐个 (或批量) 评估的函数；分数均为各引擎自身的约定 (以白方引擎身份评估)"""
+    if name == "ChessAI.heuristic_eval":
+        evaluate = ChessAI(1, True).heuristic_eval
+    elif name == "AlphaBetaAI.advanced_evaluation":
+        evaluate = AlphaBetaAI(1, True).advanced_evaluation
+    elif name == "IterativeDeepeningMinimaxAI.enhanced_evaluation":
+        evaluate = IterativeDeepeningMinimaxAI(1, True).enhanced_evaluation
+    elif name == "BetterAlphaBetaAI.evaluate":
+        evaluate = BetterAlphaBetaAI(1, True).evaluate
+    elif name in ("NeuralNetAI.single", "NeuralNetAI.batched"):
+        from NeuralNetAI import NeuralNetAI
+        from ChessUtils import board_to_matrix
+        model = NeuralNetAI(1, True).model
+        if model is None:
+            raise RuntimeError("model file not found")
+        if name == "NeuralNetAI.single":
+            # 与搜索中相同：一次一个局面
+            def evaluate(board):
+                return float(model(np.expand_dims(board_to_matrix(board), axis=0), training=False).numpy()[0][0])
+        else:
+            # 整批编码后一次推理
+            def evaluate_batch(boards):
+                batch = np.stack([board_to_matrix(board) for board in boards])
+                return [float(x) for x in model(batch, training=False).numpy()[:, 0]]
+            return evaluate_batch
+    else:
+        raise ValueError(f"Unknown evaluator: {name}")
+    return lambda boards: [evaluate(board) for board in boards]
+
+
+def run_eval_bench(fens: List[str], names: List[str] = None, repeat: int = 3) -> Dict[str, dict]:
+    """
+    在同一组局面上为每个评估函数计时 (重复 repeat 轮取最快)，
+    返回 {名称: {"scores": [...], "seconds": 最快一轮用时, "evals_per_sec": ...}}
+    """
+    names = names or EVALUATOR_NAMES
+    boards = [chess.Board(fen) for fen in fens]
+    results = {}
+    for name in names:
+        try:
+            evaluate = create_evaluator(name)
+        except (ImportError, RuntimeError) as e:
+            print(f"  跳过 {name}: {e}")
+            continue
+        best = float('inf')
+        scores = None
+        for _ in range(repeat):
+            random.seed(EVAL_SEED)
+            start = time.perf_counter()
+            round_scores = evaluate(boards)
+            best = min(best, time.perf_counter() - start)
+            scores = scores or round_scores
+        results[name] = {"scores": scores, "seconds": best, "evals_per_sec": len(boards) / best if best > 0 else 0.0}
+    return results
+
+
+def compare_scores(results: Dict[str, dict], reference: Dict[str, list], tolerance: float = 0.0) -> Dict[str, int]:
+    """与参考分数逐个比对，返回 {名称: 不一致的局面数}；参考中没有的评估函数不比对"""
+    mismatches = {}
+    for name, result in results.items():
+        if name in reference:
+            mismatches[name] = sum(1 for a, b in zip(result["scores"], reference[name]) if abs(a - b) > tolerance)
+    return mismatches
+
+
+def print_eval_table(results, num_positions, mismatches=None):
+    print("\n" + "=" * 96)
+    print(f"Evaluation benchmark ({num_positions} positions)")
+    print("=" * 96)
+    header = f"{'Evaluator':<48} | {'Evals/s':>10} | {'us/eval':>8} | {'Check':<12}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        per_eval = result["seconds"] / num_positions * 1e6 if num_positions else 0
+        if mismatches is None or name not in mismatches:
+            check = "-"
+        else:
+            check = "identical" if mismatches[name] == 0 else f"{mismatches[name]} differ"
+        print(f"{name:<48} | {result['evals_per_sec']:>10.0f} | {per_eval:>8.1f} | {check:<12}")
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluation-function micro-benchmark")
+    parser.add_argument("--positions", type=str, default=None, help='FEN/EPD file (default: random playout positions)')
+    parser.add_argument("--count", type=int, default=1000, help='Number of positions')
+    parser.add_argument("--seed", type=int, default=0, help='Seed for random playout positions')
+    parser.add_argument("--evaluators", nargs="+", default=None, choices=EVALUATOR_NAMES, help='Evaluators to time')
+    parser.add_argument("--repeat", type=int, default=3, help='Timing rounds per evaluator (fastest is reported)')
+    parser.add_argument("--save-reference", type=str, default=None,
+                        help='Save positions and scores as JSON, to check a rewritten evaluator against later')
+    parser.add_argument("--check", type=str, default=None,
+                        help='Reference JSON from --save-reference; reuses its positions and reports score mismatches')
+    parser.add_argument("--tolerance", type=float, default=1e-6, help='Allowed score difference for --check')
+    args = parser.parse_args()
+
+    reference = None
+    if args.check:
+        with open(args.check) as f:
+            reference = json.load(f)
+        fens = reference["fens"]
+    elif args.positions:
+        fens = load_positions(args.positions, args.count)
+    else:
+        fens = random_positions(args.count, args.seed)
+
+    results = run_eval_bench(fens, args.evaluators, args.repeat)
+
+    mismatches = None
+    if reference:
+        mismatches = compare_scores(results, reference["scores"], args.tolerance)
+    # 单个与批量推理应得到相同的网络输出 (浮点误差以内)
+    if "NeuralNetAI.single" in results and "NeuralNetAI.batched" in results:
+        mismatches = mismatches or {}
+        single = results["NeuralNetAI.single"]["scores"]
+        mismatches["NeuralNetAI.batched"] = sum(
+            1 for a, b in zip(results["NeuralNetAI.batched"]["scores"], single) if abs(a - b) > 1e-4)
+
+    print_eval_table(results, len(fens), mismatches)
+
+    if args.save_reference:
+        with open(args.save_reference, "w") as f:
+            json.dump({"fens": fens, "scores": {name: r["scores"] for name, r in results.items()}}, f)
+        print(f"参考分数已保存至 {args.save_reference}")
+
+    if mismatches and any(mismatches.values()):
+        sys.exit(1)
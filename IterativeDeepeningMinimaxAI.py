@@ -4,6 +4,7 @@ import random
 import time
 import chess
 from typing import Dict, List, Optional, Tuple
+from SearchInfo import SearchInfo, progress_info
 
 class IterativeDeepeningMinimaxAI():
     def __init__(self, depth: int, is_white: bool):
@@ -15,6 +16,16 @@ class IterativeDeepeningMinimaxAI():
         # 时间管理（简单版本）
         self.start_time = None
         self.time_limit = 5.0  # 5秒时间限制
+        self.node_limit: Optional[int] = None  # 节点数上限 (None 表示不限)
+        self.stop_requested = False  # 由 stop() 设置 (例如 GUI 的"立即走棋")
+        self.clock = None  # 对局棋钟 (由 ChessGame 设置)，有棋钟时按它分配的时间代替固定限制
+        self.info_sink = None  # 搜索信息输出 (见 SearchInfo)，为 None 时不发布逐层信息
+        self.last_info: Optional[SearchInfo] = None  # 最近一次搜索的最终统计
+        self.progress_interval: Optional[float] = None  # 设置后 (且有 info_sink) 搜索中每隔这么多秒发布一次进度
+        self.last_iteration: Optional[SearchInfo] = None  # 本次搜索最近完成的一层
+        self.search_start = 0.0
+        self.next_progress = 0.0
+        self.cutoffs = 0
         
         # 增强的评估参数
         self.piece_values = {
@@ -22,35 +33,54 @@ class IterativeDeepeningMinimaxAI():
             'p': -100, 'n': -320, 'b': -330, 'r': -500, 'q': -900, 'k': -20000
         }
 
+    def new_game(self):
+        """清空对局相关的状态 (最佳走法历史、棋钟)，以便同一实例连续下多局"""
+        self.best_move_history.clear()
+        self.last_info = None
+        self.time_limit = 5.0
+        self.clock = None
+
     def choose_move(self, board: chess.Board) -> chess.Move:
         """迭代加深搜索选择最佳移动"""
         start_time = time.time()
         self.start_time = datetime.datetime.now()
+        if self.clock is not None:
+            self.time_limit = self.clock.time_for_move(board.turn)
         self.nodes_visited = 0
+        self.cutoffs = 0
+        self.search_start = start_time
+        self.next_progress = start_time + (self.progress_interval or 0)
+        self.last_iteration = None
         best_move = None
         best_value = -sys.maxsize if self.is_white else sys.maxsize
-        
-        print(f"Starting iterative deepening search to depth {self.max_depth}")
+        completed_depth = 0
         
         # 迭代加深搜索
         for current_depth in range(1, self.max_depth + 1):
             if self.time_limit_reached():
-                print(f"Time limit reached at depth {current_depth - 1}")
                 break
                 
             try:
-                move, value = self.iterative_deepening_search(board, current_depth)
-                
+                move, value, completed = self.iterative_deepening_search(board, current_depth)
+
+                if not completed:
+                    # 本层被时间/节点限制或停止请求打断：正在搜索的走法的分数来自被截断的搜索，
+                    # 丢弃整层，使用上一层完整搜索的结果 (一层都没完成时才用本层已搜完的走法)
+                    if not best_move:
+                        best_move = move
+                    break
+
                 if move:
                     best_move = move
                     best_value = value
                     self.best_move_history.append(move)
-                    
-                    print(f"Depth {current_depth}: {move} (eval: {value}, nodes: {self.nodes_visited})")
+                    completed_depth = current_depth
+                    if self.info_sink is not None:
+                        self.last_iteration = self.search_info(completed_depth, value, move, start_time)
+                        self.info_sink(self.last_iteration)
                     
                     # 如果找到必胜局面，提前终止
                     if abs(value) > 50000:  # 将死分数
-                        print("Found winning move, stopping search")
                         break
                         
             except Exception as e:
@@ -61,15 +91,26 @@ class IterativeDeepeningMinimaxAI():
             # 备用策略
             best_move = self.fallback_move(board)
         
-        print(f"IterativeDeepening AI recommending move {best_move} after visiting {self.nodes_visited} nodes")
-        end_time = time.time()
-        elapsed_time = end_time - start_time  # 需在方法开始处记录start_time
-        nps = self.nodes_visited / elapsed_time if elapsed_time > 0 else 0
-        print(f"AlphaBetaAI NPS: {nps:.2f}")
+        self.last_info = self.search_info(completed_depth, best_value if completed_depth else None,
+                                          best_move, start_time, final=True)
+        if self.info_sink is not None:
+            self.info_sink(self.last_info)
+        self.stop_requested = False  # 停止请求只作用于本次搜索
         return best_move
 
-    def iterative_deepening_search(self, board: chess.Board, max_depth: int) -> Tuple[Optional[chess.Move], int]:
-        """迭代加深搜索核心"""
+    def search_info(self, depth: int, value: Optional[int], move: chess.Move,
+                    start_time: float, final: bool = False) -> SearchInfo:
+        """当前搜索的统计信息 (分数为本引擎视角，即走棋方视角)"""
+        return SearchInfo(engine=type(self).__name__, depth=depth, score=value, pv=[move],
+                          nodes=self.nodes_visited, cutoffs=self.cutoffs,
+                          time=time.time() - start_time, final=final)
+
+    def iterative_deepening_search(self, board: chess.Board, max_depth: int) -> Tuple[Optional[chess.Move], int, bool]:
+        """
+        迭代加深搜索核心，返回 (最佳走法, 分数, 本层是否完整搜索)。
+        到达限制后 minimax 返回的是静态评估而不是真正的搜索结果，因此被打断的层不完整，
+        最佳走法只在此之前搜完的根节点走法中选出
+        """
         best_move = None
         best_value = -sys.maxsize if self.is_white else sys.maxsize
         
@@ -78,21 +119,26 @@ class IterativeDeepeningMinimaxAI():
         
         for move in moves:
             if self.time_limit_reached():
-                break
+                return best_move, best_value, False
                 
             board.push(move)
             value = self.minimax(board, max_depth - 1, not self.is_white, -sys.maxsize, sys.maxsize)
             board.pop()
+            if self.time_limit_reached():
+                # 限制在这个走法的搜索中途到达，其分数不可信
+                return best_move, best_value, False
             
             if (self.is_white and value > best_value) or (not self.is_white and value < best_value):
                 best_value = value
                 best_move = move
         
-        return best_move, best_value
+        return best_move, best_value, True
 
     def minimax(self, board: chess.Board, depth: int, maximizing: bool, alpha: int, beta: int) -> int:
         """带alpha-beta剪枝的minimax算法"""
         self.nodes_visited += 1
+        if self.progress_interval and self.info_sink is not None:
+            self.publish_progress()
         
         # 终止条件
         if depth == 0 or board.is_game_over():
@@ -117,6 +163,7 @@ class IterativeDeepeningMinimaxAI():
                 alpha = max(alpha, eval_score)
                 
                 if beta <= alpha:
+                    self.cutoffs += 1
                     break  # Beta剪枝
                     
             return max_eval
@@ -131,6 +178,7 @@ class IterativeDeepeningMinimaxAI():
                 beta = min(beta, eval_score)
                 
                 if beta <= alpha:
+                    self.cutoffs += 1
                     break  # Alpha剪枝
                     
             return min_eval
@@ -202,8 +250,28 @@ class IterativeDeepeningMinimaxAI():
         
         return score if self.is_white else -score
 
+    def publish_progress(self):
+        """搜索进行中发布进度 (由 minimax 在每个节点调用，与 time_limit_reached 一样按时间判断，至多每 progress_interval 秒一次)"""
+        now = time.time()
+        if now < self.next_progress:
+            return
+        self.next_progress = now + self.progress_interval
+        self.info_sink(progress_info(self.last_iteration, type(self).__name__, nodes=self.nodes_visited,
+                                     cutoffs=self.cutoffs, time=now - self.search_start))
+
+    def stop(self):
+        """
+        请求停止搜索 (可从其他线程调用)：尽快返回已完成的最深一层的最佳走法 (被打断的一层丢弃)；
+        在搜索开始前调用同样有效，请求在本次搜索结束时清除
+        """
+        self.stop_requested = True
+
     def time_limit_reached(self) -> bool:
-        """检查时间限制"""
+        """检查时间限制 (以及节点数上限、停止请求)"""
+        if self.stop_requested:
+            return True
+        if self.node_limit and self.nodes_visited >= self.node_limit:
+            return True
         if not self.start_time:
             return False
         
@@ -0,0 +1,117 @@
+import math
+from typing import Optional, Tuple
+
+# 95% 置信区间对应的正态分位数
+Z_95 = 1.959964
+
+
+def score_to_elo(score: float) -> float:
+    """得分率 -> Elo 差 (logistic 模型)"""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def elo_to_score(elo: float) -> float:
+    """Elo 差 -> 期望得分率"""
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def score_stats(wins: float, draws: float, losses: float) -> Tuple[float, float]:
+    """返回 (平均得分, 单局得分方差)，按胜/和/负三项分布计算"""
+    games = wins + draws + losses
+    if games == 0:
+        return 0.5, 0.0
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    return score, variance
+
+
+def elo_estimate(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """
+    Elo 差估计及 95% 误差范围 (±)。
+    误差由得分率的置信区间换算，取上下界之差的一半。
+    """
+    games = wins + draws + losses
+    score, variance = score_stats(wins, draws, losses)
+    if games == 0:
+        return 0.0, float('inf')
+    if variance == 0:
+        return score_to_elo(score), float('inf')  # 全胜/全负/全和时无法给出误差范围
+    margin = Z_95 * math.sqrt(variance / games)
+    low, high = score_to_elo(score - margin), score_to_elo(score + margin)
+    return score_to_elo(score), (high - low) / 2
+
+
+class SPRT:
+    """
+    序贯概率比检验：H0 为 Elo 差 = elo0，H1 为 Elo 差 = elo1。
+    使用三项分布的正态近似 (GSPRT) 计算对数似然比 LLR，
+    LLR 越过上界接受 H1，越过下界接受 H0。
+    """
+
+    def __init__(self, elo0: float = 0.0, elo1: float = 10.0, alpha: float = 0.05, beta: float = 0.05):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def add(self, score: float):
+        """记录一局的得分 (1 / 0.5 / 0，相对被测引擎)"""
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def llr(self) -> float:
+        # 每种结果加 0.5 的伪计数，避免全胜/全负时方差为 0
+        wins, draws, losses = self.wins + 0.5, self.draws + 0.5, self.losses + 0.5
+        games = wins + draws + losses
+        score, variance = score_stats(wins, draws, losses)
+        s0, s1 = elo_to_score(self.elo0), elo_to_score(self.elo1)
+        return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+    def verdict(self) -> Optional[str]:
+        """'H1' (强于 elo1)、'H0' (不强于 elo0) 或 None (尚无结论)"""
+        llr = self.llr()
+        if llr >= self.upper:
+            return 'H1'
+        if llr <= self.lower:
+            return 'H0'
+        return None
+
+
+def fit_ratings(pair_results, iterations: int = 2000, learning_rate: float = 100.0):
+    """
+    由各组对决的 (胜, 和, 负) 拟合 logistic 模型下的 Elo 等级分 (Bradley-Terry 最大似然，
+    和棋计半分)，平均值固定为 0。全胜/全负时最大似然解发散，迭代次数起到截断作用。
+    pair_results: {(a, b): (a 胜, 和, a 负)}
+    """
+    players = sorted({p for pair in pair_results for p in pair})
+    ratings = {p: 0.0 for p in players}
+    for _ in range(iterations):
+        gradient = {p: 0.0 for p in players}
+        games = {p: 0 for p in players}
+        for (a, b), (wins, draws, losses) in pair_results.items():
+            n = wins + draws + losses
+            if n == 0:
+                continue
+            residual = (wins + 0.5 * draws) - n * elo_to_score(ratings[a] - ratings[b])
+            gradient[a] += residual
+            gradient[b] -= residual
+            games[a] += n
+            games[b] += n
+        for p in players:
+            if games[p]:
+                ratings[p] += learning_rate * gradient[p] / games[p]
+        mean = sum(ratings.values()) / len(ratings)
+        ratings = {p: r - mean for p, r in ratings.items()}
+    return ratings
@@ -0,0 +1,254 @@
+# 内存占用基准：同一个引擎实例连续下一整局 (或连续搜索一组局面)，
+# 每步之后记录进程 RSS、tracemalloc 统计以及引擎各缓存结构的条目数与字节数
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import types
+import chess
+from typing import Dict, List, Optional
+
+from NPSTester import BENCH_DEPTHS, BENCH_FENS, BENCH_SEED, create_bench_engine
+
+# 引擎中会随对局增长的结构 (属性名)；引擎没有的属性跳过
+ENGINE_STRUCTURES = ["tt", "transposition_table", "killer_moves", "history_heuristic", "best_move_history"]
+
+MB = 1024 * 1024
+
+
+def current_rss() -> Optional[int]:
+    """当前进程的常驻内存 (字节)；优先用 psutil (可选依赖)，其次读 /proc，都不可用时为 None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """进程启动以来的 RSS 峰值 (字节)"""
+    try:
+        import resource
+    except ImportError:
+        # Windows 没有 resource 模块，psutil 提供峰值工作集
+        try:
+            import psutil
+            return getattr(psutil.Process().memory_info(), "peak_wset", None)
+        except ImportError:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# 不计入结构大小的共享对象 (类、模块、函数被许多对象引用，不属于任何一个缓存)
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """
+    递归统计对象及其引用的全部对象的字节数 (sys.getsizeof 之和)。
+    同一对象只计一次，因此被多个条目共享的对象 (如同一个 chess.Move) 不会重复计算。
+    用 gc.get_referents 遍历而不访问 __dict__：Python 3.11 起实例字典是延迟创建的，访问它本身就会分配内存
+    """
+    seen = set() if seen is None else seen
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SHARED_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        stack.extend(gc.get_referents(item))
+    return total
+
+
+def model_size(model) -> Dict[str, int]:
+    """Keras 模型的参数个数与权重字节数 (不含 TensorFlow 运行时本身的内存)"""
+    params = 0
+    size = 0
+    for weight in model.weights:
+        count = int(weight.shape.num_elements())
+        params += count
+        size += count * weight.dtype.size
+    return {"entries": params, "bytes": size}
+
+
+def structure_sizes(ai) -> Dict[str, Dict[str, int]]:
+    """引擎各结构的 {名称: {"entries": 条目数, "bytes": 字节数}}"""
+    sizes = {}
+    for name in ENGINE_STRUCTURES:
+        value = getattr(ai, name, None)
+        if value is not None:
+            sizes[name] = {"entries": len(value), "bytes": deep_sizeof(value)}
+    if getattr(ai, "model", None) is not None:
+        sizes["model"] = model_size(ai.model)
+    return sizes
+
+
+def scripted_game(ai, max_plies: int, start_fen: str = chess.STARTING_FEN):
+    """
+    引擎自己和自己下一局 (同一个实例轮流执白执黑，缓存不清空)，
+    逐步产出 (局面, 走法)；对局结束或达到 max_plies 时停止
+    """
+    board = chess.Board(start_fen)
+    while not board.is_game_over() and len(board.move_stack) < max_plies:
+        ai.is_white = board.turn
+        move = ai.choose_move(board)
+        if move is None:
+            return
+        board.push(move)
+        yield board, move
+
+
+def scripted_positions(ai, fens: List[str]):
+    """依次搜索一组局面 (同一个实例，缓存不清空)，逐个产出 (局面, 走法)"""
+    for fen in fens:
+        board = chess.Board(fen)
+        ai.is_white = board.turn
+        move = ai.choose_move(board)
+        if move is None:
+            continue
+        yield board, move
+
+
+def run_memory_bench(engine_name: str, depth: Optional[int] = None, plies: int = 60, fens: List[str] = None,
+                     trace: bool = True, rss_budget: Optional[float] = None,
+                     structure_budget: Optional[float] = None, on_step=None):
+    """
+    同一引擎实例执行脚本化序列 (fens 为 None 时自对弈 plies 步，否则依次搜索 fens)，每步记录：
+    ply, move, rss, peak_rss, traced (tracemalloc 当前字节), traced_peak (本步搜索期间的峰值), structures。
+    rss_budget / structure_budget (MB) 给定时，峰值 RSS 或任一结构超出即停止，
+    返回 (记录列表, 超出预算的说明或 None, tracemalloc 快照或 None)
+    """
+    random.seed(BENCH_SEED)
+    if trace:
+        tracemalloc.start()
+    baseline_rss = current_rss()
+    ai = create_bench_engine(engine_name, depth or BENCH_DEPTHS[engine_name], True)
+    setup = {"ply": 0, "move": None, "rss": current_rss(), "baseline_rss": baseline_rss,
+             "peak_rss": peak_rss(), "structures": structure_sizes(ai)}
+    records = [setup]
+    if on_step:
+        on_step(setup)
+
+    steps = scripted_game(ai, plies) if fens is None else scripted_positions(ai, fens)
+    exceeded = None
+    snapshot = None
+    for ply, (board, move) in enumerate(steps, start=1):
+        record = {"ply": ply, "move": move.uci(), "nodes": ai.nodes_visited}
+        if trace:
+            record["traced"], record["traced_peak"] = tracemalloc.get_traced_memory()
+        record["rss"] = current_rss()
+        record["peak_rss"] = peak_rss()
+        if record["rss"] is not None and record["peak_rss"] is not None:
+            # ru_maxrss 与 /proc 的采样时机不同，峰值至少为当前值
+            record["peak_rss"] = max(record["peak_rss"], record["rss"])
+        # 统计结构大小本身会分配内存，放在读取 tracemalloc 之后，并在下一步之前清除峰值
+        record["structures"] = structure_sizes(ai)
+        if trace:
+            tracemalloc.reset_peak()
+        records.append(record)
+        if on_step:
+            on_step(record)
+
+        if rss_budget is not None and record["peak_rss"] is not None and record["peak_rss"] > rss_budget * MB:
+            exceeded = f"peak RSS {record['peak_rss'] / MB:.1f} MB > budget {rss_budget:.1f} MB at ply {ply}"
+        elif structure_budget is not None:
+            for name, size in record["structures"].items():
+                if size["bytes"] > structure_budget * MB:
+                    exceeded = f"{name} {size['bytes'] / MB:.1f} MB > budget {structure_budget:.1f} MB at ply {ply}"
+                    break
+        if exceeded:
+            break
+
+    if trace:
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+        tracemalloc.stop()
+    return records, exceeded, snapshot
+
+
+def _mb(value) -> str:
+    return f"{value / MB:>8.1f}" if value is not None else f"{'n/a':>8}"
+
+
+def print_step(record: dict):
+    """每步一行：RSS、tracemalloc、各结构的条目数/MB"""
+    if record["ply"] == 0:
+        print(f"初始化后: RSS {_mb(record['rss']).strip()} MB (创建引擎前 {_mb(record['baseline_rss']).strip()} MB)")
+        for name, size in record["structures"].items():
+            print(f"  {name}: {size['entries']} 条目, {size['bytes'] / MB:.2f} MB")
+        return
+    parts = [f"{record['ply']:>4} {record['move']:<6}", f"RSS {_mb(record['rss'])}", f"peak {_mb(record['peak_rss'])}"]
+    if "traced" in record:
+        parts.append(f"traced {_mb(record['traced'])} (move peak {_mb(record['traced_peak']).strip()})")
+    for name, size in record["structures"].items():
+        if name != "model":
+            parts.append(f"{name} {size['entries']:>7} / {size['bytes'] / MB:6.2f}")
+    print(" | ".join(parts))
+
+
+def print_top_allocators(snapshot, limit: int = 10):
+    """按源代码行汇总的 tracemalloc 分配量前 limit 名 (结束时仍存活的内存)"""
+    print("\n" + "=" * 96)
+    print(f"Top {limit} allocators (live at end, by line)")
+    print("=" * 96)
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        print(f"{stat.size / MB:>8.2f} MB | {stat.count:>8} blocks | {os.path.basename(frame.filename)}:{frame.lineno}")
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory footprint of an engine and its caches over a long game")
+    parser.add_argument("--engine", type=str, default="BetterAlphaBetaAI", choices=list(BENCH_DEPTHS), help='Engine to measure')
+    parser.add_argument("--depth", type=int, default=None, help='Search depth (default: the bench depth of the engine)')
+    parser.add_argument("--plies", type=int, default=60, help='Length of the self-play game')
+    parser.add_argument("--bench-positions", action='store_true',
+                        help='Search the bench position suite in order instead of playing a game')
+    parser.add_argument("--no-tracemalloc", action='store_true',
+                        help='Skip tracemalloc (it slows the search down and adds its own memory)')
+    parser.add_argument("--top", type=int, default=10, help='Number of top allocators to show')
+    parser.add_argument("--rss-budget", type=float, default=None, help='Fail (exit 1) when peak RSS exceeds this many MB')
+    parser.add_argument("--structure-budget", type=float, default=None,
+                        help='Fail (exit 1) when any engine structure exceeds this many MB')
+    parser.add_argument("--jsonl", type=str, default=None, help='Also write the per-move records to this JSONL file')
+    args = parser.parse_args()
+
+    start = time.time()
+    records, exceeded, snapshot = run_memory_bench(
+        args.engine, args.depth, args.plies, BENCH_FENS if args.bench_positions else None,
+        not args.no_tracemalloc, args.rss_budget, args.structure_budget, on_step=print_step)
+
+    if snapshot is not None:
+        print_top_allocators(snapshot, args.top)
+    last = records[-1]
+    print(f"\n{args.engine}: {len(records) - 1} 步, {time.time() - start:.1f} 秒, "
+          f"峰值 RSS {_mb(last['peak_rss']).strip()} MB")
+    for name, size in last["structures"].items():
+        print(f"  {name}: {size['entries']} 条目, {size['bytes'] / MB:.2f} MB")
+
+    if args.jsonl:
+        with open(args.jsonl, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        print(f"逐步记录已保存至 {args.jsonl}")
+
+    if exceeded:
+        print(f"超出内存预算: {exceeded}")
+        sys.exit(1)
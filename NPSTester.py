@@ -1,15 +1,193 @@
+import argparse
+import cProfile
+import os
+import pstats
+import random
+import sys
 import chess
 import time
-import matplotlib.pyplot as plt
 import numpy as np
 from collections import defaultdict
 
-# 导入所有AI类
+# 导入所有AI类 (NeuralNetAI 延迟导入，不需要时不加载 TensorFlow)
 from RandomAI import RandomAI
 from AlphaBetaAI import AlphaBetaAI
 from BetterAlphaBetaAI import BetterAlphaBetaAI
 from IterativeDeepeningMinimaxAI import IterativeDeepeningMinimaxAI
-from NeuralNetAI import NeuralNetAI
+from SearchProfiler import PHASE_ORDER, PhaseTimer, StackSampler
+from PerfHistory import DEFAULT_HISTORY_PATH, PerfHistory, bench_config, current_commit, plot_trend, print_comparison
+
+# --- bench：固定局面集 + 固定深度 + 固定随机种子 ---
+# 节点总数只取决于搜索逻辑，可作为签名：签名变了说明搜索行为变了，签名不变而 NPS 变了说明只是速度变了
+BENCH_SEED = 20240601
+BENCH_FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 11",
+    "4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - 7 19",
+    "rq3rk1/ppp2ppp/1bnpb3/3N2B1/3NP3/7P/PPPQ1PP1/2KR3R w - - 7 14",
+    "r1bq1r1k/1pp1n1pp/1p1p4/4p2Q/4Pp2/1BNP4/PPP2PPP/3R1RK1 w - - 2 14",
+    "r3r1k1/2p2ppp/p1p1bn2/8/1q2P3/2NPQN2/PPP3PP/R4RK1 b - - 2 15",
+    "r1bbk1nr/pp3p1p/2n5/1N4p1/2Np1B2/8/PPP2PPP/2KR1B1R w kq - 0 13",
+    "r1bq1rk1/ppp1nppp/4n3/3p3Q/3P4/1BP1B3/PP1N2PP/R4RK1 w - - 1 16",
+    "4r1k1/r1q2ppp/ppp2n2/4P3/5Rb1/1N1BQ3/PPP3PP/R5K1 w - - 1 17",
+    "2rqkb1r/ppp2p2/2npb1p1/1N1Nn2p/2P1PP2/8/PP2B1PP/R1BQK2R b KQ - 0 11",
+    "r1bq1r1k/b1p1npp1/p2p3p/1p6/3PP3/1B2NN2/PP3PPP/R2Q1RK1 w - - 1 16",
+    "3r1rk1/p5pp/bpp1pp2/8/q1PP1P2/b3P3/P2NQRPP/1R2B1K1 b - - 6 22",
+    "r1q2rk1/2p1bppp/2Pp4/p6b/Q1PNp3/4B3/PP1R1PPP/2K4R w - - 2 18",
+    "4k2r/1pb2ppp/1p2p3/1R1p4/3P4/2r1PN2/P4PPP/1R4K1 b - - 3 22",
+    "3q2k1/pb3p1p/4pbp1/2r5/PpN2N2/1P2P2P/5PP1/Q2R2K1 b - - 4 26",
+    "6k1/6p1/6Pp/ppp5/3pn2P/1P3K2/1PP2P2/3N4 b - - 0 1",
+    "3b4/5kp1/1p1p1p1p/pP1PpP1P/P1P1P3/3KN3/8/8 w - - 0 1",
+    "2K5/p7/7P/5pR1/8/5k2/r7/8 w - - 0 1",
+    "8/6pk/1p6/8/PP3p1p/5P2/4KP1q/3Q4 w - - 0 1",
+    "7k/3p2pp/4q3/8/4Q3/5Kp1/P6b/8 w - - 0 1",
+    "8/2p5/8/2kPKp1p/2p4P/2P5/3P4/8 w - - 0 1",
+    "8/1p3pp1/7p/5P1P/2k3P1/8/2K2P2/8 w - - 0 1",
+    "8/pp2r1k1/2p1p3/3pP2p/1P1P1P1P/P5KR/8/8 w - - 0 1",
+    "8/3p4/p1bk3p/Pp6/1Kp1PpPp/2P2P1P/2P5/5B2 b - - 0 1",
+    "5k2/7R/4P2p/5K2/p1r2P1p/8/8/8 b - - 0 1",
+    "6k1/6p1/P6p/r1N5/5p2/7P/1b3PP1/4R1K1 w - - 0 1",
+    "1r3k2/4q3/2Pp3b/3Bp3/2Q2p2/1p1P2P1/1P2KP2/3N4 w - - 0 1",
+    "6k1/4pp1p/3p2p1/P1pPb3/R7/1r2P1PP/3B1P2/6K1 w - - 0 1",
+    "8/3p3B/5p2/5P2/p7/PP5b/k7/6K1 w - - 0 1",
+]
+
+# 各引擎的默认 bench 深度 (使整个局面集在几秒到几十秒内完成)
+BENCH_DEPTHS = {
+    "AlphaBetaAI": 3,
+    "BetterAlphaBetaAI": 3,
+    "IterativeMinimaxAI": 2,
+    "NeuralNetAI": 2,
+}
+
+
+def create_bench_engine(name: str, depth: int, is_white: bool):
+    """创建 bench 用的引擎实例；去掉所有与时间有关的限制，使节点数只由深度决定"""
+    if name == "AlphaBetaAI":
+        return AlphaBetaAI(depth, is_white)
+    elif name == "BetterAlphaBetaAI":
+        return BetterAlphaBetaAI(depth, is_white)
+    elif name == "IterativeMinimaxAI":
+        ai = IterativeDeepeningMinimaxAI(depth, is_white)
+        ai.time_limit = float('inf')
+        return ai
+    elif name == "NeuralNetAI":
+        from NeuralNetAI import NeuralNetAI
+        return NeuralNetAI(depth, is_white)
+    raise ValueError(f"Unknown engine: {name}")
+
+
+def run_bench(engine_names=None, depth=None, fens=None):
+    """
+    每个引擎在每个局面上以固定深度搜索一次 (每个局面前重置随机种子并新建引擎)，
+    返回 [{engine, depth, positions, nodes, seconds, nps}]
+    """
+    engine_names = engine_names or list(BENCH_DEPTHS)
+    fens = fens or BENCH_FENS
+    results = []
+    for name in engine_names:
+        engine_depth = depth or BENCH_DEPTHS[name]
+        total_nodes = 0
+        total_time = 0.0
+        for i, fen in enumerate(fens):
+            board = chess.Board(fen)
+            random.seed(BENCH_SEED)
+            ai = create_bench_engine(name, engine_depth, board.turn)
+            start = time.perf_counter()
+            ai.choose_move(board)
+            total_time += time.perf_counter() - start
+            total_nodes += ai.nodes_visited
+            print(f"\r  {name}: 局面 {i + 1}/{len(fens)}", end="", flush=True)
+        print()
+        results.append({
+            "engine": name, "depth": engine_depth, "positions": len(fens), "nodes": total_nodes,
+            "seconds": total_time, "nps": total_nodes / total_time if total_time > 0 else 0.0,
+        })
+    return results
+
+
+def print_bench_table(results):
+    print("\n" + "=" * 72)
+    print("Bench (fixed positions, fixed depth, seeded)")
+    print("=" * 72)
+    header = f"{'Engine':<20} | {'Depth':>5} | {'Nodes (signature)':>17} | {'Time (s)':>9} | {'NPS':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(f"{row['engine']:<20} | {row['depth']:>5} | {row['nodes']:>17} | {row['seconds']:>9.2f} | {row['nps']:>9.0f}")
+    print("=" * 72)
+    total_nodes = sum(row['nodes'] for row in results)
+    total_time = sum(row['seconds'] for row in results)
+    print(f"Total nodes: {total_nodes}  NPS: {total_nodes / total_time if total_time > 0 else 0:.0f}")
+
+def run_profile(engine_names=None, depth=None, output_dir=".", use_cprofile=False, fens=None):
+    """
+    剖析模式：在 bench 局面集上运行每个引擎，同时
+    1. 对引擎和棋盘的方法插桩，统计各阶段 (走法生成、排序、哈希、评估、终局判断、走子/撤销、NN 编码/推理) 的独占用时；
+    2. 采样调用栈，写出 <output_dir>/profile_<引擎>.collapsed 供火焰图工具使用；
+    3. use_cprofile 为 True 时额外用 cProfile 运行，保存 profile_<引擎>.prof 并打印耗时最多的函数。
+    返回 {引擎: (总用时, {阶段: 用时}, {阶段: 调用次数})}
+    """
+    engine_names = engine_names or list(BENCH_DEPTHS)
+    fens = fens or BENCH_FENS
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    for name in engine_names:
+        engine_depth = depth or BENCH_DEPTHS[name]
+        timer = PhaseTimer()
+        sampler = StackSampler()
+        profiler = cProfile.Profile() if use_cprofile else None
+        total_time = 0.0
+
+        sampler.start()
+        for i, fen in enumerate(fens):
+            board = chess.Board(fen)
+            random.seed(BENCH_SEED)
+            ai = create_bench_engine(name, engine_depth, board.turn)
+            timer.instrument(ai, board)
+            start = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            ai.choose_move(board)
+            if profiler:
+                profiler.disable()
+            total_time += time.perf_counter() - start
+            timer.restore()
+            print(f"\r  {name}: 局面 {i + 1}/{len(fens)}", end="", flush=True)
+        sampler.stop()
+        print()
+
+        collapsed_path = os.path.join(output_dir, f"profile_{name}.collapsed")
+        sampler.write_collapsed(collapsed_path)
+        print(f"  调用栈采样 -> {collapsed_path}")
+        if profiler:
+            prof_path = os.path.join(output_dir, f"profile_{name}.prof")
+            profiler.dump_stats(prof_path)
+            print(f"  cProfile -> {prof_path}")
+            pstats.Stats(profiler).sort_stats("tottime").print_stats(15)
+        results[name] = (total_time, dict(timer.times), dict(timer.calls))
+    return results
+
+
+def print_profile_table(results):
+    """每个引擎一张阶段用时表；插桩本身有开销，比例比绝对时间更有参考价值"""
+    for name, (total_time, times, calls) in results.items():
+        print("\n" + "=" * 64)
+        print(f"Profile: {name} (total {total_time:.2f}s, instrumented)")
+        print("=" * 64)
+        header = f"{'Phase':<14} | {'Time (s)':>9} | {'Share':>7} | {'Calls':>10} | {'us/call':>8}"
+        print(header)
+        print("-" * len(header))
+        phases = [p for p in PHASE_ORDER if p in times]
+        for phase in phases:
+            share = times[phase] / total_time * 100 if total_time > 0 else 0
+            per_call = times[phase] / calls[phase] * 1e6 if calls[phase] else 0
+            print(f"{phase:<14} | {times[phase]:>9.3f} | {share:>6.1f}% | {calls[phase]:>10} | {per_call:>8.1f}")
+        other = total_time - sum(times.values())
+        print(f"{'search/other':<14} | {other:>9.3f} | {other / total_time * 100 if total_time > 0 else 0:>6.1f}% | {'':>10} | {'':>8}")
+        print("=" * 64)
+
 
 class NPSTester:
     def __init__(self, num_tests=5, depth=3):
@@ -28,11 +206,10 @@ class NPSTester:
             board.set_fen(self.initial_board.fen())
             
             # 创建AI实例
-            if ai_class in [ AlphaBetaAI, BetterAlphaBetaAI, 
-                           IterativeDeepeningMinimaxAI, NeuralNetAI]:
-                ai = ai_class(self.depth, is_white)
-            else:
+            if ai_class is RandomAI:
                 ai = ai_class()  # RandomAI不需要参数
+            else:
+                ai = ai_class(self.depth, is_white)
             
             # 记录开始时间和初始节点数
             start_time = time.time()
@@ -62,6 +239,7 @@ class NPSTester:
 
     def run_all_tests(self):
         """测试所有AI模型"""
+        from NeuralNetAI import NeuralNetAI
         # 定义要测试的AI列表 (类, 名称)
         ai_list = [
             (RandomAI, "RandomAI"),
@@ -77,6 +255,7 @@ class NPSTester:
 
     def generate_chart(self, output_path="nps_analysis.png"):
         """生成柱状图"""
+        import matplotlib.pyplot as plt
         if not self.results:
             print("没有测试结果可生成图表")
             return
@@ -114,9 +293,62 @@ class NPSTester:
         plt.show()
 
 if __name__ == "__main__":
-    # 初始化测试器（5次测试，搜索深度3）
-    tester = NPSTester(num_tests=5, depth=3)
-    # 运行所有测试
-    tester.run_all_tests()
-    # 生成图表
-    tester.generate_chart()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Engine speed tests")
+    parser.add_argument("--bench", action='store_true',
+                        help='Reproducible bench: fixed depth over a fixed position suite, prints a node-count signature')
+    parser.add_argument("--engines", nargs="+", default=None, choices=list(BENCH_DEPTHS), help='Engines to bench')
+    parser.add_argument("--depth", type=int, default=None, help='Bench depth for every engine (default: per-engine)')
+    parser.add_argument("--profile", action='store_true',
+                        help='Profile the bench: per-phase time breakdown and collapsed-stack files for flame graphs')
+    parser.add_argument("--cprofile", action='store_true', help='With --profile, also run under cProfile and save .prof files')
+    parser.add_argument("--profile-dir", type=str, default=".", help='Where to write profile output files')
+    parser.add_argument("--record", action='store_true', help='Save --bench results to the history, keyed by git commit')
+    parser.add_argument("--history", type=str, default=DEFAULT_HISTORY_PATH, help='Bench history database')
+    parser.add_argument("--compare", type=str, default=None, metavar="BASELINE",
+                        help='Compare against a baseline commit in the history; exits 1 on regression')
+    parser.add_argument("--candidate", type=str, default=None,
+                        help='Commit to compare (default: the current commit, "-dirty" when the tree has changes)')
+    parser.add_argument("--threshold", type=float, default=5.0, help='Regression threshold in percent (NPS or time to depth)')
+    parser.add_argument("--trend", type=str, default=None, metavar="PNG", help='Plot the NPS history to this file')
+    args = parser.parse_args()
+    if args.record and (not args.bench or args.profile):
+        parser.error("--record only saves --bench results (use --bench --record, without --profile)")
+
+    history = PerfHistory(args.history) if (args.record or args.compare or args.trend) else None
+
+    if args.profile:
+        print_profile_table(run_profile(args.engines, args.depth, args.profile_dir, args.cprofile))
+    elif args.bench:
+        results = run_bench(args.engines, args.depth)
+        print_bench_table(results)
+        if args.record:
+            commit_id = current_commit()
+            history.record(results, commit_id, {r["engine"]: bench_config(r["depth"], BENCH_FENS) for r in results})
+            print(f"已记录到 {args.history} (提交 {commit_id})")
+    elif not (args.compare or args.trend):
+        # 初始化测试器（5次测试，搜索深度3）
+        tester = NPSTester(num_tests=5, depth=3)
+        # 运行所有测试
+        tester.run_all_tests()
+        # 生成图表
+        tester.generate_chart()
+
+    if args.trend:
+        plot_trend(history, args.trend)
+    if args.compare:
+        candidate = args.candidate or current_commit()
+        for commit_id in (args.compare, candidate):
+            try:
+                found = history.resolve_commit(commit_id)
+            except ValueError as e:
+                print(e)
+                sys.exit(2)
+            if found is None:
+                # 缺少记录时不能静默改用其他提交，否则比较的不是想要的两个版本
+                print(f"{args.history} 中没有提交 {commit_id} 的 bench 记录 (先用 --bench --record 记录)")
+                sys.exit(2)
+        threshold = args.threshold / 100
+        rows = history.compare(args.compare, candidate, threshold)
+        print_comparison(rows, args.compare, candidate, threshold)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
\ No newline at end of file
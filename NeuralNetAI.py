@@ -6,24 +6,39 @@ import os
 from AlphaBetaAI import AlphaBetaAI
 from ChessUtils import board_to_matrix
 
+# 默认模型路径；蒸馏得到的学生网络可通过 model_path 参数指定
+DEFAULT_MODEL_PATH = './AI-chess/model/chess_model.keras'
+
+# 搜索限制的检查间隔 (节点数)，见 SearchControl.LIMIT_CHECK_INTERVAL
+NEURAL_LIMIT_CHECK_INTERVAL = 16
+
+# 进程内已加载的模型 (路径 -> 模型)，同一进程中的多个实例共享，避免每局重新加载
+_loaded_models = {}
+
 class NeuralNetAI(AlphaBetaAI):
-    def __init__(self, depth: int, is_white: bool):
+    def __init__(self, depth: int, is_white: bool, model_path: str = DEFAULT_MODEL_PATH):
         # 初始化父类
         super().__init__(depth, is_white)
+        # 每个叶节点调用一次模型，节点比父类慢得多：更频繁地检查时间与停止请求，避免超时
+        self.limit_check_interval = NEURAL_LIMIT_CHECK_INTERVAL
         self.model = None
+        self.model_path = model_path
         self.load_model()
         
     def load_model(self):
         """加载训练好的模型"""
-        model_path = './AI-chess/model/chess_model.keras'
-        if os.path.exists(model_path):
+        model_path = self.model_path
+        if model_path in _loaded_models:
+            self.model = _loaded_models[model_path]
+        elif os.path.exists(model_path):
             try:
                 self.model = tf.keras.models.load_model(model_path)
+                _loaded_models[model_path] = self.model
                 print("Neural Network model loaded successfully.")
             except Exception as e:
                 print(f"Error loading model: {e}")
         else:
-            print("Warning: 'chess_model.h5' not found. NeuralAI will behave randomly.")
+            print(f"Warning: '{model_path}' not found. NeuralAI will behave randomly.")
 
     def advanced_evaluation(self, board: chess.Board) -> int:
         """
@@ -63,5 +78,5 @@ class NeuralNetAI(AlphaBetaAI):
         # 查看你的 AlphaBetaAI 代码，最后返回的是: return score if self.is_white else -score
         # 这意味着 advanced_evaluation 应该返回 "对该 AI 有利程度" 的绝对值，或者标准白正黑负值。
         
-        # 假设你的 AlphaBetaAI 逻辑是标准的 "Evaluate for White"，然后根据 is_white 翻转：
-        return score
\ No newline at end of file
+        # 与父类一致：白方视角的分数按 is_white 翻转为 AI 视角 (终局分数已是 AI 视角)
+        return score if self.is_white else -score
\ No newline at end of file
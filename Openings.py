@@ -0,0 +1,66 @@
+import random
+import sys
+import chess
+import chess.pgn
+from typing import List
+
+from BetterAlphaBetaAI import BetterAlphaBetaAI
+
+
+def load_openings(path: str) -> List[str]:
+    """
+    读取开局文件，返回起始局面 FEN 列表：
+    .epd: 每行一个 EPD 局面 (操作码被忽略)
+    .pgn: 每局走完主线后的局面
+    """
+    openings = []
+    if path.lower().endswith('.pgn'):
+        with open(path) as f:
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                board = game.board()
+                for move in game.mainline_moves():
+                    board.push(move)
+                openings.append(board.fen())
+    else:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    board, _ = chess.Board.from_epd(line)
+                    openings.append(board.fen())
+
+    if not openings:
+        raise ValueError(f"No openings found in {path}")
+    return openings
+
+
+def random_balanced_openings(count: int, plies: int = 8, max_imbalance: int = 100, seed: int = 0) -> List[str]:
+    """
+    随机走 plies 步生成开局，只保留静态搜索 (吃子序列走完后) 评估
+    在 ±max_imbalance 厘兵以内的局面，避免一方开局即大优。
+    """
+    rng = random.Random(seed)
+    evaluator = BetterAlphaBetaAI(1, True)
+    openings = []
+    seen = set()
+
+    while len(openings) < count:
+        board = chess.Board()
+        for _ in range(plies):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        if board.is_game_over() or board.fen() in seen:
+            continue
+
+        turn_multiplier = 1 if board.turn else -1
+        score = evaluator.quiescence(board, -sys.maxsize, sys.maxsize, turn_multiplier)
+        if abs(score) <= max_imbalance:
+            seen.add(board.fen())
+            openings.append(board.fen())
+
+    return openings
@@ -0,0 +1,169 @@
+import hashlib
+import sqlite3
+import statistics
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_HISTORY_PATH = "bench_history.sqlite"
+
+
+def current_commit() -> str:
+    """当前 git 提交的短哈希；工作区有未提交的修改时加 "-dirty" 后缀，不在 git 仓库中时为 "unknown" """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def bench_config(depth: int, fens: List[str]) -> str:
+    """bench 配置键：深度相同且局面集相同的结果才可比较"""
+    suite = hashlib.sha1("\n".join(fens).encode()).hexdigest()[:8]
+    return f"depth={depth};positions={len(fens)};suite={suite}"
+
+
+class PerfHistory:
+    """
+    基于 SQLite 的 bench 历史：每次运行按 (提交, 引擎, 配置) 记录节点数、用时与 NPS。
+    同一提交的多次运行取中位数，用于与基线比较。
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY, timestamp REAL NOT NULL, commit_id TEXT NOT NULL, "
+            "engine TEXT NOT NULL, config TEXT NOT NULL, nodes INTEGER NOT NULL, "
+            "seconds REAL NOT NULL, nps REAL NOT NULL, time_to_depth REAL NOT NULL)"
+        )
+
+    def record(self, results: List[dict], commit_id: str, configs: Dict[str, str]):
+        """记录一次 bench (NPSTester.run_bench 的返回值)；configs 为 {引擎: 配置键}"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO runs (timestamp, commit_id, engine, config, nodes, seconds, nps, time_to_depth) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((now, commit_id, r["engine"], configs[r["engine"]], r["nodes"], r["seconds"], r["nps"],
+                  r["seconds"] / r["positions"]) for r in results)
+            )
+
+    def resolve_commit(self, commit_id: str) -> Optional[str]:
+        """
+        历史中与 commit_id 对应的提交：优先完全匹配 (包括 "<哈希>-dirty")；
+        否则把前缀展开为唯一的干净提交 (不含 -dirty 记录)。没有记录时为 None，前缀不唯一时抛出 ValueError
+        """
+        commits = [row[0] for row in self.conn.execute("SELECT DISTINCT commit_id FROM runs")]
+        if commit_id in commits:
+            return commit_id
+        matches = sorted(c for c in commits if c.startswith(commit_id) and not c.endswith("-dirty"))
+        if len(matches) > 1:
+            raise ValueError(f"提交前缀 {commit_id} 不唯一: {', '.join(matches)}")
+        return matches[0] if matches else None
+
+    def summary(self, commit_id: str) -> Dict[tuple, dict]:
+        """
+        某个提交 (可写前缀，见 resolve_commit) 的结果：{(引擎, 配置): {nodes, nps, time_to_depth, runs}}，
+        多次运行取中位数；没有记录时为空字典
+        """
+        commit_id = self.resolve_commit(commit_id)
+        if commit_id is None:
+            return {}
+        rows = self.conn.execute(
+            "SELECT engine, config, nodes, nps, time_to_depth FROM runs WHERE commit_id = ? ORDER BY timestamp",
+            (commit_id,)
+        ).fetchall()
+        grouped = {}
+        for engine, config, nodes, nps, time_to_depth in rows:
+            grouped.setdefault((engine, config), []).append((nodes, nps, time_to_depth))
+        return {
+            key: {
+                "nodes": runs[-1][0],
+                "nps": statistics.median(r[1] for r in runs),
+                "time_to_depth": statistics.median(r[2] for r in runs),
+                "runs": len(runs),
+            }
+            for key, runs in grouped.items()
+        }
+
+    def compare(self, baseline: str, candidate: str, threshold: float = 0.05) -> List[dict]:
+        """
+        比较候选提交与基线提交中相同 (引擎, 配置) 的结果。
+        NPS 下降或到达深度用时增加超过 threshold (比例) 记为回退；
+        节点数不同说明搜索行为变了，此时 NPS 仍可比，但用时的变化可能来自搜索树本身。
+        """
+        base = self.summary(baseline)
+        rows = []
+        for key, cand in self.summary(candidate).items():
+            if key not in base:
+                continue
+            ref = base[key]
+            nps_change = cand["nps"] / ref["nps"] - 1 if ref["nps"] else 0.0
+            time_change = cand["time_to_depth"] / ref["time_to_depth"] - 1 if ref["time_to_depth"] else 0.0
+            rows.append({
+                "engine": key[0], "config": key[1],
+                "base_nps": ref["nps"], "nps": cand["nps"], "nps_change": nps_change,
+                "base_time": ref["time_to_depth"], "time": cand["time_to_depth"], "time_change": time_change,
+                "search_changed": cand["nodes"] != ref["nodes"],
+                "regression": nps_change < -threshold or time_change > threshold,
+            })
+        return rows
+
+    def trend(self, engine: str) -> List[tuple]:
+        """某个引擎的历史 [(时间戳, 提交, 配置, NPS)]，按时间排序"""
+        return self.conn.execute(
+            "SELECT timestamp, commit_id, config, nps FROM runs WHERE engine = ? ORDER BY timestamp", (engine,)
+        ).fetchall()
+
+    def engines(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT engine FROM runs ORDER BY engine")]
+
+    def close(self):
+        self.conn.close()
+
+
+def print_comparison(rows: List[dict], baseline: str, candidate: str, threshold: float):
+    print("\n" + "=" * 100)
+    print(f"Bench comparison: {candidate} vs baseline {baseline} (threshold {threshold * 100:.1f}%)")
+    print("=" * 100)
+    header = (f"{'Engine':<20} | {'Base NPS':>9} | {'NPS':>9} | {'Change':>7} | "
+              f"{'Base s/pos':>10} | {'s/pos':>8} | {'Change':>7} | Status")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        status = "REGRESSION" if row["regression"] else "ok"
+        if row["search_changed"]:
+            status += " (search changed)"
+        print(f"{row['engine']:<20} | {row['base_nps']:>9.0f} | {row['nps']:>9.0f} | {row['nps_change'] * 100:>+6.1f}% | "
+              f"{row['base_time']:>10.4f} | {row['time']:>8.4f} | {row['time_change'] * 100:>+6.1f}% | {status}")
+    if not rows:
+        print("没有可比较的结果 (两个提交需要有相同引擎、相同配置的 bench 记录)")
+    print("=" * 100)
+
+
+def plot_trend(history: PerfHistory, output_path: str = "nps_trend.png"):
+    """每个引擎 (每种配置) 一条 NPS 随时间变化的折线，横轴标注提交"""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    for engine in history.engines():
+        by_config = {}
+        for timestamp, commit_id, config, nps in history.trend(engine):
+            by_config.setdefault(config, []).append((timestamp, commit_id, nps))
+        for config, points in by_config.items():
+            label = engine if len(by_config) == 1 else f"{engine} ({config})"
+            plt.plot([p[0] for p in points], [p[2] for p in points], marker='o', label=label)
+            for timestamp, commit_id, nps in points:
+                plt.annotate(commit_id, (timestamp, nps), fontsize=7, rotation=45)
+
+    plt.xlabel('Time', fontsize=12)
+    plt.ylabel('Nodes Per Second (NPS)', fontsize=12)
+    plt.title('Bench NPS History', fontsize=14)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150)
+    print(f"趋势图已保存至 {output_path}")
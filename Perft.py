@@ -0,0 +1,118 @@
+import argparse
+import sys
+import time
+import chess
+from multiprocessing import Pool
+from typing import Dict, Optional
+
+# 标准 perft 测试局面及已知叶节点数 (chessprogramming.org "Perft Results")
+# 名称 -> (FEN, [深度 1, 深度 2, ...])
+PERFT_SUITE = {
+    "startpos": (chess.STARTING_FEN, [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 [48, 2039, 97862, 4085603]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                  [6, 264, 9467, 422333]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    "position6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+                  [46, 2079, 89890, 3894594]),
+}
+
+
+def perft(board: chess.Board, depth: int) -> int:
+    """统计 depth 层的叶节点数 (最后一层直接计数合法走法，不逐个走子)"""
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+def _perft_root_move(task):
+    """工作进程：走一个根节点走法后统计剩余深度的叶节点数"""
+    fen, uci, depth = task
+    board = chess.Board(fen)
+    board.push(chess.Move.from_uci(uci))
+    return uci, perft(board, depth - 1)
+
+
+def divide(board: chess.Board, depth: int, workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    按根节点走法分别统计叶节点数 ({UCI 走法: 节点数})，用于与参考引擎逐步比对找出错误。
+    workers 大于 1 时根节点走法分配到进程池并行计算。
+    """
+    tasks = [(board.fen(), move.uci(), depth) for move in board.legal_moves]
+    if workers and workers > 1 and depth > 1:
+        with Pool(workers) as pool:
+            return dict(pool.imap(_perft_root_move, tasks))
+    return dict(_perft_root_move(task) for task in tasks)
+
+
+def run_perft(fen: str, depth: int, workers: Optional[int] = None):
+    """返回 (叶节点数, 用时秒数)"""
+    board = chess.Board(fen)
+    start = time.perf_counter()
+    if workers and workers > 1 and depth > 1:
+        nodes = sum(divide(board, depth, workers).values())
+    else:
+        nodes = perft(board, depth)
+    return nodes, time.perf_counter() - start
+
+
+def run_suite(max_nodes: int = 1_000_000, workers: Optional[int] = None) -> bool:
+    """
+    对标准局面逐层运行 perft 并核对已知节点数 (超过 max_nodes 的深度跳过)，
+    打印每层的结果与叶节点/秒，全部正确时返回 True。
+    """
+    all_passed = True
+    total_nodes = 0
+    total_time = 0.0
+    print(f"{'Position':<10} | {'Depth':>5} | {'Nodes':>10} | {'Expected':>10} | {'Time (s)':>8} | {'Nodes/s':>9} | Result")
+    print("-" * 78)
+    for name, (fen, expected_counts) in PERFT_SUITE.items():
+        for depth, expected in enumerate(expected_counts, start=1):
+            if expected > max_nodes:
+                break
+            nodes, elapsed = run_perft(fen, depth, workers)
+            passed = nodes == expected
+            all_passed &= passed
+            total_nodes += nodes
+            total_time += elapsed
+            rate = nodes / elapsed if elapsed > 0 else 0
+            print(f"{name:<10} | {depth:>5} | {nodes:>10} | {expected:>10} | {elapsed:>8.3f} | {rate:>9.0f} | "
+                  f"{'ok' if passed else 'FAIL'}")
+    print("-" * 78)
+    print(f"总计: {total_nodes} 节点, {total_time:.2f} 秒, "
+          f"{total_nodes / total_time if total_time > 0 else 0:.0f} 节点/秒 -> {'全部正确' if all_passed else '存在错误'}")
+    return all_passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perft: move generation correctness and throughput")
+    parser.add_argument("--fen", type=str, default=None, help='Position to test (default: run the standard suite)')
+    parser.add_argument("--depth", type=int, default=4, help='Perft depth for --fen')
+    parser.add_argument("--divide", action='store_true', help='Print the node count of every root move for --fen')
+    parser.add_argument("--max-nodes", type=int, default=1_000_000, help='Suite: skip depths with more leaf nodes than this')
+    parser.add_argument("--workers", type=int, default=None, help='Split root moves across this many processes')
+    args = parser.parse_args()
+
+    if args.fen is None:
+        sys.exit(0 if run_suite(args.max_nodes, args.workers) else 1)
+
+    if args.divide:
+        start = time.perf_counter()
+        counts = divide(chess.Board(args.fen), args.depth, args.workers)
+        elapsed = time.perf_counter() - start
+        for uci, count in sorted(counts.items()):
+            print(f"{uci}: {count}")
+        nodes = sum(counts.values())
+        print(f"\n走法数: {len(counts)}")
+    else:
+        nodes, elapsed = run_perft(args.fen, args.depth, args.workers)
+    print(f"节点数: {nodes}, 用时 {elapsed:.3f} 秒, {nodes / elapsed if elapsed > 0 else 0:.0f} 节点/秒")
@@ -0,0 +1,105 @@
+import argparse
+import csv
+import os
+import chess.pgn
+from typing import Dict, List, Optional
+
+# 索引中保存的对局头字段
+INDEX_HEADERS = ['Event', 'Date', 'White', 'Black', 'Result', 'WhiteElo', 'BlackElo', 'TimeControl', 'ECO']
+INDEX_FIELDS = ['offset'] + INDEX_HEADERS
+
+
+def default_index_path(pgn_path: str) -> str:
+    return pgn_path + '.idx.csv'
+
+
+def build_index(pgn_path: str, index_path: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    只解析对局头 (chess.pgn.read_headers 会跳过着法部分)，
+    记录每局在文件中的偏移量，并保存为 CSV 索引。
+    """
+    index_path = index_path or default_index_path(pgn_path)
+    entries = []
+
+    with open(pgn_path) as f:
+        while True:
+            offset = f.tell()
+            headers = chess.pgn.read_headers(f)
+            if headers is None:
+                break
+            entry = {'offset': offset}
+            for name in INDEX_HEADERS:
+                entry[name] = headers.get(name, '')
+            entries.append(entry)
+            if len(entries) % 1000 == 0:
+                print(f"Indexed game {len(entries)}", end='\r')
+
+    with open(index_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+        writer.writeheader()
+        writer.writerows(entries)
+
+    print(f"索引完成: {len(entries)} 局 -> {index_path}")
+    return entries
+
+
+def load_index(pgn_path: str, index_path: Optional[str] = None) -> List[Dict[str, str]]:
+    """读取索引；索引不存在或比 PGN 旧时重新建立"""
+    index_path = index_path or default_index_path(pgn_path)
+    if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(pgn_path):
+        return build_index(pgn_path, index_path)
+
+    with open(index_path, newline='') as f:
+        entries = list(csv.DictReader(f))
+    for entry in entries:
+        entry['offset'] = int(entry['offset'])
+    return entries
+
+
+def _elo(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_games(entries: List[Dict[str, str]], min_elo: Optional[int] = None,
+                 time_control: Optional[str] = None, result: Optional[str] = None) -> List[int]:
+    """
+    按条件筛选对局，返回偏移量列表：
+    min_elo: 双方等级分都不低于该值 (缺失等级分的对局被排除)
+    time_control: TimeControl 头完全一致 (如 "180+2")
+    result: 结果一致 (如 "1-0")
+    """
+    offsets = []
+    for entry in entries:
+        if min_elo is not None:
+            white_elo, black_elo = _elo(entry['WhiteElo']), _elo(entry['BlackElo'])
+            if white_elo is None or black_elo is None or min(white_elo, black_elo) < min_elo:
+                continue
+        if time_control is not None and entry['TimeControl'] != time_control:
+            continue
+        if result is not None and entry['Result'] != result:
+            continue
+        offsets.append(entry['offset'])
+    return offsets
+
+
+def select_offsets(pgn_path: str, min_elo: Optional[int] = None,
+                   time_control: Optional[str] = None, result: Optional[str] = None) -> List[int]:
+    """加载 (或建立) 索引并筛选，返回可直接传给数据集构建函数的偏移量"""
+    return filter_games(load_index(pgn_path), min_elo=min_elo, time_control=time_control, result=result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a header-only PGN index and query it")
+    parser.add_argument("pgn", type=str, help='PGN file')
+    parser.add_argument("--rebuild", action='store_true', help='Rebuild the index even if it is up to date')
+    parser.add_argument("--min-elo", type=int, default=None, help='Minimum Elo of both players')
+    parser.add_argument("--time-control", type=str, default=None, help='Exact TimeControl header, e.g. 180+2')
+    parser.add_argument("--result", type=str, default=None, choices=["1-0", "0-1", "1/2-1/2"], help='Game result')
+    args = parser.parse_args()
+
+    entries = build_index(args.pgn) if args.rebuild else load_index(args.pgn)
+    offsets = filter_games(entries, min_elo=args.min_elo, time_control=args.time_control, result=args.result)
+    print(f"匹配对局: {len(offsets)}/{len(entries)}")
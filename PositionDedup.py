@@ -0,0 +1,179 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import chess
+import chess.polyglot
+from typing import Dict, Iterator, List, Tuple
+
+from ChessUtils import DATASET_FIELDS, iter_pgn_positions
+
+
+def _signed64(value: int) -> int:
+    """Zobrist 哈希是无符号 64 位整数，SQLite 的 INTEGER 是有符号 64 位"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+class PositionIndex:
+    """
+    基于 SQLite 的磁盘去重索引：Zobrist 哈希 -> (FEN, 标签和, 出现次数)。
+    写入先在内存中按批聚合，满 batch_size 个不同局面后合并进磁盘，
+    因此内存占用与数据集大小无关。
+    """
+
+    def __init__(self, index_path: str, batch_size: int = 50000):
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(index_path)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS positions ("
+            "hash INTEGER PRIMARY KEY, fen TEXT NOT NULL, "
+            "total REAL NOT NULL, count INTEGER NOT NULL)"
+        )
+        # 索引的来源与状态 (见 build_dedup_dataset 的复用逻辑)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # 待合并的批次: hash -> [fen, 标签和, 次数]
+        self.pending: Dict[int, List] = {}
+        self.positions_seen = 0
+
+    def add(self, board: chess.Board, label: float):
+        """加入一个局面及其标签"""
+        self.positions_seen += 1
+        key = _signed64(chess.polyglot.zobrist_hash(board))
+        entry = self.pending.get(key)
+        if entry:
+            entry[1] += label
+            entry[2] += 1
+        else:
+            self.pending[key] = [board.fen(), label, 1]
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """将内存中的批次合并进磁盘索引"""
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO positions (hash, fen, total, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(hash) DO UPDATE SET "
+                "total = total + excluded.total, count = count + excluded.count",
+                ((key, fen, total, count) for key, (fen, total, count) in self.pending.items())
+            )
+        self.pending = {}
+
+    def get_meta(self, key: str):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def clear(self):
+        """清空索引 (局面与来源记录)"""
+        self.pending = {}
+        self.positions_seen = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM positions")
+            self.conn.execute("DELETE FROM meta")
+
+    def __len__(self) -> int:
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def iter_entries(self) -> Iterator[Tuple[str, float, int]]:
+        """
+        逐行产出 (fen, 平均标签, 出现次数)。
+        按哈希顺序遍历，相当于对局面做了一次打乱。
+        """
+        self.flush()
+        for fen, total, count in self.conn.execute("SELECT fen, total, count FROM positions"):
+            yield fen, total / count, count
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def write_dataset(entries: Iterator[Tuple[str, float, int]], output_path: str) -> int:
+    """将 (fen, label, count) 流写入 CSV 数据集，返回写入行数"""
+    written = 0
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(DATASET_FIELDS)
+        for fen, label, count in entries:
+            writer.writerow([fen, f"{label:.6f}", count])
+            written += 1
+    return written
+
+
+def source_fingerprint(pgn_path: str, max_games: int = None, offsets: List[int] = None) -> str:
+    """索引来源的指纹：PGN 文件 (路径、大小、修改时间) 与对局选择 (max_games、offsets)"""
+    stat = os.stat(pgn_path)
+    source = [os.path.abspath(pgn_path), stat.st_size, stat.st_mtime_ns, max_games, offsets]
+    return hashlib.sha1(json.dumps(source).encode()).hexdigest()
+
+
+def build_dedup_dataset(pgn_path: str, output_path: str, index_path: str = None,
+                        max_games: int = None, keep_index: bool = False, offsets: List[int] = None) -> int:
+    """
+    从 PGN 流式构建去重数据集：
+    1. 每个局面按 Zobrist 哈希写入磁盘索引，重复局面的标签累加
+    2. 遍历索引一次，写出 (fen, 平均结果, 次数)
+    offsets: 可选，只处理这些偏移量处的对局 (见 PgnIndex.py)
+    keep_index: 保留索引；再次运行时若索引来自同一来源 (source_fingerprint) 且已完整写入，
+                跳过解析直接写出数据集，否则清空后重建 (避免重复累加标签和次数)
+    """
+    if index_path is None:
+        index_path = output_path + '.index.sqlite'
+    if os.path.exists(index_path) and not keep_index:
+        os.remove(index_path)
+
+    index = PositionIndex(index_path)
+    fingerprint = source_fingerprint(pgn_path, max_games, offsets)
+    if index.get_meta("source") == fingerprint:
+        index.positions_seen = int(index.get_meta("positions_seen"))
+        print(f"复用已有索引 {index_path} (来源未变化)")
+    else:
+        index.clear()
+        for board, y in iter_pgn_positions(pgn_path, max_games=max_games, offsets=offsets):
+            index.add(board, y)
+        index.flush()
+        # 全部写入后才记录来源：中途中断的索引下次会被清空重建
+        index.set_meta("positions_seen", str(index.positions_seen))
+        index.set_meta("source", fingerprint)
+
+    written = write_dataset(index.iter_entries(), output_path)
+    print(f"\n局面总数: {index.positions_seen}, 去重后: {written} "
+          f"({written / max(index.positions_seen, 1) * 100:.1f}%)")
+    index.close()
+
+    if not keep_index:
+        os.remove(index_path)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate PGN positions into a CSV dataset")
+    parser.add_argument("pgn", type=str, help='Input PGN file')
+    parser.add_argument("output", type=str, help='Output CSV dataset')
+    parser.add_argument("--max-games", type=int, default=None, help='Maximum number of games to parse')
+    parser.add_argument("--index", type=str, default=None, help='Path of the on-disk index (default: <output>.index.sqlite)')
+    parser.add_argument("--keep-index", action='store_true', help='Keep the on-disk index and reuse it while the PGN and game selection are unchanged')
+    parser.add_argument("--min-elo", type=int, default=None, help='Only games where both players have at least this Elo')
+    parser.add_argument("--time-control", type=str, default=None, help='Only games with this exact TimeControl header')
+    parser.add_argument("--result", type=str, default=None, choices=["1-0", "0-1", "1/2-1/2"], help='Only games with this result')
+    args = parser.parse_args()
+
+    offsets = None
+    if args.min_elo is not None or args.time_control is not None or args.result is not None:
+        from PgnIndex import select_offsets
+        offsets = select_offsets(args.pgn, min_elo=args.min_elo, time_control=args.time_control, result=args.result)
+
+    build_dedup_dataset(args.pgn, args.output, index_path=args.index,
+                        max_games=args.max_games, keep_index=args.keep_index, offsets=offsets)
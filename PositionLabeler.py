@@ -0,0 +1,146 @@
+import argparse
+import csv
+import os
+import time
+import chess
+from itertools import islice
+from multiprocessing import Pool
+
+from ChessUtils import DATASET_FIELDS, iter_pgn_positions
+from BetterAlphaBetaAI import BetterAlphaBetaAI
+
+# 每批提交给进程池的局面数，避免一次性把整个输入读入内存
+BATCH_SIZE = 10000
+
+# 工作进程内复用的引擎实例
+_engine = None
+
+
+def _init_worker(depth, node_limit):
+    global _engine
+    _engine = BetterAlphaBetaAI(depth, True)
+    _engine.node_limit = node_limit
+
+
+def score_position(fen: str):
+    """
+    工作进程：搜索一个局面，返回白方视角的分数 (厘兵)。
+    每个局面前清空置换表等状态，使分数与该进程之前处理过哪些局面无关。
+    """
+    _engine.tt.clear()
+    _engine.killer_moves.clear()
+    _engine.history_heuristic.clear()
+
+    board = chess.Board(fen)
+    if board.is_game_over():
+        return ''
+    _engine.is_white = board.turn
+    _engine.choose_move(board)
+    score = _engine.last_score
+    if score is None:
+        return ''
+    return score if board.turn == chess.WHITE else -score
+
+
+def iter_input_rows(input_path: str, max_games: int = None):
+    """读取 CSV 数据集或 PGN，统一产出 dict 行"""
+    if input_path.lower().endswith('.pgn'):
+        for board, y in iter_pgn_positions(input_path, max_games=max_games):
+            yield {'fen': board.fen(), 'label': f"{y:.1f}", 'count': 1}
+    else:
+        with open(input_path, newline='') as f:
+            yield from csv.DictReader(f)
+
+
+def input_fields(input_path: str):
+    if input_path.lower().endswith('.pgn'):
+        return list(DATASET_FIELDS)
+    with open(input_path, newline='') as f:
+        return next(csv.reader(f))
+
+
+def count_finished_rows(output_path: str) -> int:
+    """
+    统计已写入的数据行数 (断点续跑)。
+    若上次中断时最后一行没写完整，将其截掉。
+    文件不存在或连表头都没有完整写入时返回 -1 (需要重新写表头)。
+    """
+    if not os.path.exists(output_path):
+        return -1
+
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            last_newline = data.rfind(b'\n')
+            f.truncate(last_newline + 1)
+            data = data[:last_newline + 1]
+    if not data:
+        return -1
+    return data.count(b'\n') - 1
+
+
+def label_dataset(input_path, output_path, column='score', depth=3, node_limit=None,
+                  workers=None, max_games=None):
+    """
+    用固定深度 (或固定节点数) 的 BetterAlphaBetaAI 搜索为每个局面打分，
+    作为新增标签列写入输出文件。输出顺序与输入一致，中断后重新运行会从断点继续。
+    """
+    workers = workers or os.cpu_count()
+    fields = input_fields(input_path)
+    if column not in fields:
+        fields.append(column)
+
+    finished = count_finished_rows(output_path)
+    if finished >= 0:
+        print(f"从第 {finished} 个局面继续...")
+        out = open(output_path, 'a', newline='')
+        writer = csv.DictWriter(out, fieldnames=fields)
+    else:
+        finished = 0
+        out = open(output_path, 'w', newline='')
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+
+    rows = islice(iter_input_rows(input_path, max_games), finished, None)
+    limit_text = f"{node_limit} 节点" if node_limit else f"深度 {depth}"
+    print(f"局面打分: {limit_text}, {workers} 个进程")
+
+    start_time = time.time()
+    labeled = 0
+    with Pool(workers, initializer=_init_worker, initargs=(depth, node_limit)) as pool:
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            scores = pool.imap(score_position, (row['fen'] for row in batch), chunksize=16)
+            for row, score in zip(batch, scores):
+                row[column] = score
+                writer.writerow(row)
+                labeled += 1
+                if labeled % 100 == 0:
+                    elapsed = time.time() - start_time
+                    print(f"\r  已打分: {finished + labeled}, {labeled / elapsed:.1f} 局面/秒, "
+                          f"每核 {labeled / elapsed / workers:.1f} 局面/秒", end="", flush=True)
+            out.flush()
+
+    out.close()
+    elapsed = time.time() - start_time
+    rate = labeled / elapsed if elapsed > 0 else 0
+    print(f"\n完成: 本次 {labeled} 个局面, 用时 {elapsed:.1f} 秒, "
+          f"{rate:.1f} 局面/秒, 每核 {rate / workers:.1f} 局面/秒")
+    return labeled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Label dataset positions with BetterAlphaBeta search scores")
+    parser.add_argument("input", type=str, help='Input CSV dataset or PGN file')
+    parser.add_argument("output", type=str, help='Output CSV dataset (resumed if it exists)')
+    parser.add_argument("--column", type=str, default="score", help='Name of the score column')
+    parser.add_argument("--depth", type=int, default=3, help='Fixed search depth')
+    parser.add_argument("--nodes", type=int, default=None, help='Fixed node budget per position (searches up to --depth)')
+    parser.add_argument("--workers", type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument("--max-games", type=int, default=None, help='Maximum games to read from a PGN input')
+    args = parser.parse_args()
+
+    label_dataset(args.input, args.output, column=args.column, depth=args.depth,
+                  node_limit=args.nodes, workers=args.workers, max_games=args.max_games)
@@ -1,31 +1,45 @@
 
 import datetime
 import random
+from SearchInfo import SearchInfo
 
 
 class RandomAI():
-    def __init__(self):
-        pass
+    def __init__(self, seed=None):
+        # with a seed the moves are reproducible (used by AutoBattle), otherwise reseed from the clock
+        self.rng = random.Random(seed) if seed is not None else None
+        self.info_sink = None  # 搜索信息输出 (见 SearchInfo)
+        self.last_info = None
 
     def choose_move(self, board):
 
         moves = list(board.legal_moves)
-        # changed the seed so it would randomize differently
-        random.seed(int(datetime.datetime.utcnow().timestamp()) * 299)
-        move = random.choice(moves)
+        if self.rng is not None:
+            rng = self.rng
+        else:
+            # changed the seed so it would randomize differently
+            random.seed(int(datetime.datetime.utcnow().timestamp()) * 299)
+            rng = random
+        move = rng.choice(moves)
 
         # added to help avoid the loops resulting in the 5 repeated states stalemate
         board.push(move)
         if self.cuttoff_test(board) and len(moves) > 1:
             board.pop()
             moves.remove(move)
-            move = random.choice(moves)
+            move = rng.choice(moves)
         else:
             board.pop()
 
-        print("Random AI recommending move " + str(move))
+        self.last_info = SearchInfo(engine="RandomAI", pv=[move], final=True)
+        if self.info_sink is not None:
+            self.info_sink(self.last_info)
         return move
 
+    def stop(self):
+        # 随机走法没有搜索过程，不需要停止 (保持与其他引擎相同的接口)
+        pass
+
     def cuttoff_test(self, board):
         # checks if the game is entering a stalemate state that would end the game
         if board.is_stalemate():
@@ -0,0 +1,27 @@
+# 搜索控制：各引擎共用的中止机制
+from typing import Optional
+
+# 默认每隔多少个节点检查一次搜索限制 (时间、节点数、停止请求)。
+# 这些引擎用 Python 实现，每个节点都很慢，检查间隔决定了超时与停止的延迟；
+# 一次检查只是读一次时钟，相对一个节点的开销可以忽略，因此间隔取得较小。
+# 节点更慢的引擎 (如每个叶节点调用一次神经网络的 NeuralNetAI) 用 limit_check_interval 设置更小的间隔
+LIMIT_CHECK_INTERVAL = 64
+
+class SearchAborted(Exception):
+    """达到搜索限制 (节点数上限、时间用完) 时在搜索内部抛出，由 choose_move 捕获"""
+    pass
+
+class FixedMoveTime:
+    """固定每步用时 (相当于 UCI 的 movetime)，可以代替棋钟赋给引擎的 clock"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def time_for_move(self, color, moves_to_go=30) -> float:
+        return self.seconds
+
+def move_deadline(clock, color, start_time: float) -> Optional[float]:
+    """根据棋钟为本步分配时间，返回截止时刻 (无棋钟时为 None)"""
+    if clock is None:
+        return None
+    return start_time + clock.time_for_move(color)
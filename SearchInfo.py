@@ -0,0 +1,103 @@
+# 搜索信息：引擎在 choose_move 中发布的结构化统计，取代逐层 print
+import json
+import logging
+from typing import List, Optional
+
+import chess
+
+
+class SearchInfo:
+    """
+    一次搜索 (或其中一层迭代) 的统计信息。
+    depth: 完成的迭代深度；seldepth: 含静态搜索在内到达的最大层数
+    score: 根节点分数 (厘兵)；pv: 主要变例 (chess.Move 列表)
+    nodes: 总节点数 (含静态搜索)；qnodes: 静态搜索节点数
+    tt_hits: 置换表命中次数；cutoffs: beta 剪枝次数
+    time: 用时 (秒)；final: 是否为本步搜索的最终结果
+    """
+    __slots__ = ('engine', 'depth', 'seldepth', 'score', 'pv', 'nodes', 'qnodes',
+                 'tt_hits', 'cutoffs', 'time', 'final')
+
+    def __init__(self, engine: str = '', depth: int = 0, seldepth: int = 0, score: Optional[int] = None,
+                 pv: Optional[List[chess.Move]] = None, nodes: int = 0, qnodes: int = 0,
+                 tt_hits: int = 0, cutoffs: int = 0, time: float = 0.0, final: bool = False):
+        self.engine = engine
+        self.depth = depth
+        self.seldepth = max(seldepth, depth)
+        self.score = score
+        self.pv = pv or []
+        self.nodes = nodes
+        self.qnodes = qnodes
+        self.tt_hits = tt_hits
+        self.cutoffs = cutoffs
+        self.time = time
+        self.final = final
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.time if self.time > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['pv'] = [move.uci() for move in self.pv]
+        data['time'] = round(self.time, 6)
+        data['nps'] = round(self.nps, 1)
+        return data
+
+    def __str__(self):
+        # 与 UCI 协议的 info 行格式一致
+        parts = [f"info depth {self.depth} seldepth {self.seldepth}"]
+        if self.score is not None:
+            parts.append(f"score cp {self.score}")
+        parts.append(f"nodes {self.nodes} qnodes {self.qnodes} tthits {self.tt_hits} cutoffs {self.cutoffs} "
+                     f"time {int(self.time * 1000)} nps {int(self.nps)}")
+        if self.pv:
+            parts.append("pv " + " ".join(move.uci() for move in self.pv))
+        return " ".join(parts)
+
+
+def progress_info(iteration: Optional[SearchInfo], engine: str, **counters) -> SearchInfo:
+    """
+    迭代进行中的进度：深度、分数、主要变例沿用最近完成的一层 (iteration，尚无时为空)，
+    节点数、用时等计数 (counters) 为当前值
+    """
+    if iteration is None:
+        return SearchInfo(engine=engine, **counters)
+    return SearchInfo(engine=engine, depth=iteration.depth, score=iteration.score, pv=iteration.pv, **counters)
+
+
+# --- 输出方式 (sink)：任何接受 SearchInfo 的可调用对象都可以，例如 GUI 的回调函数 ---
+# 引擎的 info_sink 为 None 时不构造逐层信息。每步结束时总是构造最终的 last_info (自对弈标签、对局裁决、
+# 战术测试等依赖其中的分数、深度和节点数)；qnodes、选择性深度和完整主要变例只在设置了 info_sink
+# 或引擎的 collect_stats 为 True 时统计，否则为 0 / 只含根节点走法
+
+def print_sink(info: SearchInfo):
+    """打印到控制台 (调试用)"""
+    print(f"{info.engine}: {info}")
+
+
+class LoggingSink:
+    """写入 logging"""
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger("search")
+        self.level = level
+
+    def __call__(self, info: SearchInfo):
+        self.logger.log(self.level, "%s: %s", info.engine, info)
+
+
+class JsonlSink:
+    """每条信息写成 JSONL 一行；only_final 为 True 时只记录每步的最终结果"""
+
+    def __init__(self, path: str, only_final: bool = False):
+        self.file = open(path, 'a', buffering=1)
+        self.only_final = only_final
+
+    def __call__(self, info: SearchInfo):
+        if self.only_final and not info.final:
+            return
+        self.file.write(json.dumps(info.to_dict()) + "\n")
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,178 @@
+# 搜索剖析：分阶段计时 + 采样式调用栈 (collapsed stack 格式，可直接交给 flamegraph 工具)
+import os
+import sys
+import threading
+import time
+import types
+from collections import Counter, defaultdict
+
+# 引擎方法 -> 阶段
+ENGINE_PHASES = [
+    ("order_moves", "ordering"),
+    ("order_moves_with_history", "ordering"),
+    ("evaluate", "evaluation"),
+    ("advanced_evaluation", "evaluation"),
+    ("enhanced_evaluation", "evaluation"),
+    ("get_board_hash", "hashing"),
+]
+
+# chess.Board 方法 -> 阶段 (fen() 被 AlphaBetaAI 用作置换表键，计入 hashing)
+BOARD_PHASES = [
+    ("generate_legal_moves", "movegen"),
+    ("generate_legal_captures", "movegen"),
+    ("is_game_over", "game over"),
+    ("is_checkmate", "game over"),
+    ("is_stalemate", "game over"),
+    ("is_insufficient_material", "game over"),
+    ("can_claim_draw", "game over"),
+    ("push", "make/unmake"),
+    ("pop", "make/unmake"),
+    ("fen", "hashing"),
+]
+
+PHASE_ORDER = ["movegen", "ordering", "hashing", "evaluation", "game over", "make/unmake",
+               "nn encode", "nn inference"]
+
+
+_MISSING = object()
+
+
+class PhaseTimer:
+    """
+    分阶段计时 (独占时间：嵌套调用的阶段从外层阶段中扣除)。
+    通过在实例上替换方法来插桩，搜索代码本身不含任何计时逻辑，不剖析时没有开销。
+    """
+
+    def __init__(self):
+        self.times = defaultdict(float)
+        self.calls = Counter()
+        self._stack = []  # [阶段, 开始时刻, 子阶段累计用时]
+        self._replaced = []  # (对象, 属性名, 原先实例字典中的值)
+
+    def _replace(self, owner, name: str, value):
+        self._replaced.append((owner, name, owner.__dict__.get(name, _MISSING)))
+        setattr(owner, name, value)
+
+    def wrap(self, owner, name: str, phase: str):
+        """把 owner.name 替换为计时版本 (owner 可以是实例或模块)"""
+        original = getattr(owner, name, None)
+        if original is None:
+            return
+        stack = self._stack
+        times = self.times
+        calls = self.calls
+
+        def leave():
+            _, start, child = stack.pop()
+            elapsed = time.perf_counter() - start
+            times[phase] += elapsed - child
+            if stack:
+                stack[-1][2] += elapsed
+
+        def timed_generator(generator):
+            # 生成器 (如 generate_legal_moves) 的工作发生在迭代时，逐个元素计时
+            while True:
+                stack.append([phase, time.perf_counter(), 0.0])
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    leave()
+                yield item
+
+        def timed(*args, **kwargs):
+            calls[phase] += 1
+            stack.append([phase, time.perf_counter(), 0.0])
+            try:
+                result = original(*args, **kwargs)
+            finally:
+                leave()
+            return timed_generator(result) if isinstance(result, types.GeneratorType) else result
+
+        self._replace(owner, name, timed)
+
+    def instrument(self, ai, board):
+        """为引擎和棋盘插桩；NeuralNetAI 额外统计局面编码与网络推理"""
+        for name, phase in ENGINE_PHASES:
+            self.wrap(ai, name, phase)
+        for name, phase in BOARD_PHASES:
+            self.wrap(board, name, phase)
+        engine_module = sys.modules.get(type(ai).__module__)
+        if hasattr(engine_module, "board_to_matrix"):
+            self.wrap(engine_module, "board_to_matrix", "nn encode")
+        if getattr(ai, "model", None) is not None:
+            self._replace(ai, "model", _TimedModel(self, ai.model))
+
+    def restore(self):
+        """撤销插桩"""
+        for owner, name, previous in reversed(self._replaced):
+            if previous is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, previous)
+        self._replaced = []
+
+
+class _TimedModel:
+    """代理 Keras 模型：调用计入 nn inference 阶段，其余属性转发给原模型"""
+
+    def __init__(self, timer: PhaseTimer, model):
+        self.model = model
+        timer.wrap(self, "call", "nn inference")
+
+    def call(self, *args, **kwargs):
+        return self.model(*args, **kwargs)
+
+    def __call__(self, *args, **kwargs):
+        return self.call(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class StackSampler:
+    """
+    采样式剖析：后台线程定期读取目标线程的调用栈并计数，
+    输出 collapsed stack 格式 ("外层;...;内层 次数")。
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = None
+        self._old_switch_interval = None
+        self._skip_file = StackSampler._run.__code__.co_filename  # 本模块 (插桩包装函数) 的栈帧不计入
+
+    def start(self):
+        # 缩短 GIL 切换间隔，否则采样线程最多每 5ms 才能运行一次
+        self._old_switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.interval / 2)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._old_switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != self._skip_file:
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def write_collapsed(self, path: str):
+        """写出 collapsed stack 文件 (可用 flamegraph.pl、speedscope 等工具查看)"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
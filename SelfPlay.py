@@ -0,0 +1,167 @@
+import argparse
+import csv
+import os
+import random
+import time
+import chess
+from multiprocessing import Pool
+
+from ChessUtils import DATASET_FIELDS, result_to_label
+from BetterAlphaBetaAI import BetterAlphaBetaAI
+
+# 自对弈数据集在标准字段之外多一列 score：搜索分数 (厘兵，白方视角)
+SELFPLAY_FIELDS = DATASET_FIELDS + ['score']
+
+
+def create_engine(engine_name: str, depth: int, is_white: bool):
+    """根据名称创建自对弈引擎 (NeuralNetAI 延迟导入，避免不需要时加载 TensorFlow)"""
+    if engine_name == "BetterAlphaBeta":
+        return BetterAlphaBetaAI(depth, is_white)
+    elif engine_name == "NeuralNetAI":
+        from NeuralNetAI import NeuralNetAI
+        return NeuralNetAI(depth, is_white)
+    else:
+        raise ValueError(f"Unknown engine: {engine_name}")
+
+
+def random_opening(rng: random.Random, min_plies: int, max_plies: int) -> chess.Board:
+    """随机走若干步作为开局，保证对局多样性"""
+    while True:
+        board = chess.Board()
+        for _ in range(rng.randint(min_plies, max_plies)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        if not board.is_game_over():
+            return board
+
+
+def white_score(board: chess.Board, player):
+    """
+    刚走完本步的引擎给出的分数，换算为白方视角 (厘兵)；引擎没有发布分数时为 None，数据集中该列留空。
+    board: 走棋前的局面 (走棋方即引擎所执的一方)
+    """
+    info = getattr(player, 'last_info', None)
+    score = info.score if info is not None else None
+    if score is not None and board.turn == chess.BLACK:
+        score = -score
+    return score
+
+
+def play_selfplay_game(task):
+    """
+    工作进程：下一局自对弈，返回该局记录的所有行。
+    每局使用 (seed + 局号) 作为随机种子，结果与调度顺序无关。
+    """
+    game_index, engine_name, depth, seed, min_plies, max_plies, max_moves = task
+    rng = random.Random(seed + game_index)
+    random.seed(seed + game_index)
+
+    board = random_opening(rng, min_plies, max_plies)
+    players = {
+        chess.WHITE: create_engine(engine_name, depth, True),
+        chess.BLACK: create_engine(engine_name, depth, False),
+    }
+
+    positions = []  # (fen, 白方视角分数 或 None)
+    move_count = 0
+    while not board.is_game_over() and move_count < max_moves:
+        player = players[board.turn]
+        fen = board.fen()
+        move = player.choose_move(board)
+
+        positions.append((fen, white_score(board, player)))
+
+        board.push(move)
+        move_count += 1
+
+    # 达到步数上限视为和棋
+    y = result_to_label(board.result(claim_draw=True))
+    return [[fen, f"{y:.1f}", 1, '' if score is None else score] for fen, score in positions]
+
+
+class ShardWriter:
+    """按固定行数切分输出文件：selfplay_00000.csv, selfplay_00001.csv ..."""
+
+    def __init__(self, output_dir: str, shard_size: int):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.shard_index = 0
+        self.rows_in_shard = 0
+        self.file = None
+        self.writer = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _open_next(self):
+        self.close()
+        path = os.path.join(self.output_dir, f"selfplay_{self.shard_index:05d}.csv")
+        self.shard_index += 1
+        self.rows_in_shard = 0
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(SELFPLAY_FIELDS)
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self.writer is None or self.rows_in_shard >= self.shard_size:
+                self._open_next()
+            self.writer.writerow(row)
+            self.rows_in_shard += 1
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+
+def generate_selfplay_data(output_dir, num_games, engine_name="BetterAlphaBeta", depth=2,
+                           workers=None, seed=0, min_plies=4, max_plies=12,
+                           max_moves=200, shard_size=100000):
+    """
+    并行自对弈：每局是一个独立任务，由进程池动态分配，
+    主进程只负责把完成的对局流式写入分片文件。
+    """
+    workers = workers or os.cpu_count()
+    tasks = [(i, engine_name, depth, seed, min_plies, max_plies, max_moves) for i in range(num_games)]
+    writer = ShardWriter(output_dir, shard_size)
+
+    print(f"自对弈: {engine_name} 深度 {depth}, 共 {num_games} 局, {workers} 个进程")
+    start_time = time.time()
+    total_positions = 0
+
+    with Pool(workers) as pool:
+        for done, rows in enumerate(pool.imap_unordered(play_selfplay_game, tasks), 1):
+            writer.write_rows(rows)
+            total_positions += len(rows)
+            elapsed = time.time() - start_time
+            print(f"\r  进度: {done}/{num_games} 局, {total_positions} 个局面, "
+                  f"{total_positions / elapsed:.1f} 局面/秒", end="", flush=True)
+
+    writer.close()
+    elapsed = time.time() - start_time
+    print(f"\n完成: {total_positions} 个局面, 用时 {elapsed:.1f} 秒, "
+          f"每核 {total_positions / elapsed / workers:.1f} 局面/秒")
+    return total_positions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate labeled positions by parallel self-play")
+    parser.add_argument("output_dir", type=str, help='Directory for the dataset shards')
+    parser.add_argument("--games", type=int, default=100, help='Number of self-play games')
+    parser.add_argument("--engine", type=str, default="BetterAlphaBeta", choices=["BetterAlphaBeta", "NeuralNetAI"], help='Engine playing both sides')
+    parser.add_argument("--depth", type=int, default=2, help='Search depth')
+    parser.add_argument("--workers", type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument("--seed", type=int, default=0, help='Base random seed')
+    parser.add_argument("--min-plies", type=int, default=4, help='Minimum random opening plies')
+    parser.add_argument("--max-plies", type=int, default=12, help='Maximum random opening plies')
+    parser.add_argument("--max-moves", type=int, default=200, help='Move cap per game (counted as a draw)')
+    parser.add_argument("--shard-size", type=int, default=100000, help='Positions per shard file')
+    args = parser.parse_args()
+
+    generate_selfplay_data(args.output_dir, args.games, engine_name=args.engine, depth=args.depth,
+                           workers=args.workers, seed=args.seed, min_plies=args.min_plies,
+                           max_plies=args.max_plies, max_moves=args.max_moves,
+                           shard_size=args.shard_size)
@@ -0,0 +1,212 @@
+# 战术测试集：读取带 bm (最佳走法) / am (应避免的走法) 操作的 EPD 局面，
+# 各引擎在限定时间或节点数内搜索，记录是否找到正确走法以及找到它所用的时间 (time-to-solution)
+import argparse
+import json
+import random
+import time
+import zlib
+import chess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+from AutoBattle import create_ai, format_duration
+from SearchControl import FixedMoveTime
+
+
+def load_suite(path: str) -> List[dict]:
+    """读取 EPD 测试集，返回 [{id, fen, bm: [UCI], am: [UCI]}]；没有 bm/am 的行跳过"""
+    positions = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                board, ops = chess.Board.from_epd(line)
+            except ValueError as e:
+                print(f"  跳过第 {line_number} 行: {e}")
+                continue
+            if "bm" not in ops and "am" not in ops:
+                print(f"  跳过第 {line_number} 行: 没有 bm/am")
+                continue
+            positions.append({
+                "id": ops.get("id") or f"{path}:{line_number}",
+                "fen": board.fen(),
+                "bm": [move.uci() for move in ops.get("bm", [])],
+                "am": [move.uci() for move in ops.get("am", [])],
+            })
+    return positions
+
+
+def is_solution(move: Optional[chess.Move], position: dict) -> bool:
+    """走法是 bm 之一 (有 bm 时) 且不是 am 之一"""
+    if move is None:
+        return False
+    uci = move.uci()
+    if position["bm"] and uci not in position["bm"]:
+        return False
+    return uci not in position["am"]
+
+
+def solve_position(engine_spec: str, position: dict, move_time: Optional[float] = None,
+                   node_limit: Optional[int] = None, seed: Optional[int] = None) -> dict:
+    """
+    引擎在一个局面上搜索一次，通过 info_sink 收集每层迭代的结果 (引擎只发布完整搜索的层)。
+    time-to-solution：从某一层起，之后每一层的首选走法都正确 (且最终走法正确)，取该层完成的时刻；
+    只有完整搜索的层才计入，最终走法虽然正确但没有任何完整的层支持时 (例如一层都没搜完) 不算解出；
+    返回 {engine, id, move, solved, solution_time, solution_depth, solution_nodes, time, depth, nodes}
+    """
+    if seed is not None:
+        random.seed(seed)
+    board = chess.Board(position["fen"])
+    ai = create_ai(engine_spec, board.turn, seed, timed=True)
+    if hasattr(ai, "time_limit"):
+        # ID-Minimax 默认 5 秒限制；只限节点数时去掉，限时时由下面的 clock 设置
+        ai.time_limit = float('inf')
+    if move_time is not None and hasattr(ai, "clock"):
+        ai.clock = FixedMoveTime(move_time)
+    if node_limit is not None and hasattr(ai, "node_limit"):
+        ai.node_limit = node_limit
+    iterations = []
+    if hasattr(ai, "info_sink"):
+        def collect(info):
+            if not info.final:
+                iterations.append(info)
+        ai.info_sink = collect
+
+    start = time.perf_counter()
+    move = ai.choose_move(board)
+    elapsed = time.perf_counter() - start
+    final = getattr(ai, "last_info", None)
+
+    result = {
+        "engine": engine_spec, "id": position["id"], "move": move.uci() if move else None,
+        "solved": is_solution(move, position), "solution_time": None, "solution_depth": None,
+        "solution_nodes": None, "time": elapsed,
+        "depth": final.depth if final else 0, "nodes": final.nodes if final else 0,
+    }
+    if result["solved"]:
+        # 从最后一层往前找，直到遇到首选走法错误的一层
+        solution = None
+        for info in reversed(iterations):
+            if not info.pv or not is_solution(info.pv[0], position):
+                break
+            solution = info
+        if solution is None:
+            result["solved"] = False
+        else:
+            result["solution_time"] = solution.time
+            result["solution_depth"] = solution.depth
+            result["solution_nodes"] = solution.nodes
+    return result
+
+
+def solve_task(task) -> dict:
+    """工作进程执行的单个 (引擎, 局面) 任务；随机种子只由引擎与局面决定"""
+    engine_spec, position, move_time, node_limit = task
+    seed = zlib.crc32(f"{engine_spec}:{position['id']}".encode())
+    return solve_position(engine_spec, position, move_time, node_limit, seed)
+
+
+def run_suite(engine_specs: List[str], positions: List[dict], move_time: Optional[float] = None,
+              node_limit: Optional[int] = None, workers: Optional[int] = None) -> List[dict]:
+    """
+    所有 (引擎, 局面) 任务分发到进程池，返回每个任务的结果 (按引擎、局面原顺序排列)。
+    注意限时搜索时并行进程数不宜超过 CPU 核数，否则各进程分到的 CPU 时间不足，time-to-solution 偏大
+    """
+    tasks = [(spec, position, move_time, node_limit) for spec in engine_specs for position in positions]
+    order = {(task[0], task[1]["id"]): i for i, task in enumerate(tasks)}
+    results = []
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_task, task) for task in tasks]
+        for future in as_completed(futures):
+            results.append(future.result())
+            elapsed = time.time() - start_time
+            remaining = len(tasks) - len(results)
+            print(f"\r  进度: {len(results)}/{len(tasks)} | 已用 {format_duration(elapsed)} | "
+                  f"预计剩余 {format_duration(elapsed / len(results) * remaining)}  ", end="", flush=True)
+    print(" -> 完成")
+    results.sort(key=lambda r: order[(r["engine"], r["id"])])
+    return results
+
+
+def summarize(results: List[dict]) -> List[dict]:
+    """按引擎汇总：解出数、平均 time-to-solution / 深度 / 节点数 (只计解出的局面)"""
+    by_engine = {}
+    for result in results:
+        by_engine.setdefault(result["engine"], []).append(result)
+    summary = []
+    for engine, engine_results in by_engine.items():
+        solved = [r for r in engine_results if r["solved"]]
+        count = len(solved)
+        summary.append({
+            "engine": engine, "positions": len(engine_results), "solved": count,
+            "mean_time": sum(r["solution_time"] for r in solved) / count if count else None,
+            "mean_depth": sum(r["solution_depth"] for r in solved) / count if count else None,
+            "mean_nodes": sum(r["solution_nodes"] for r in solved) / count if count else None,
+            "total_time": sum(r["time"] for r in engine_results),
+        })
+    return summary
+
+
+def print_positions(results: List[dict]):
+    """逐个局面的结果"""
+    print(f"\n{'Engine':<28} | {'Id':<20} | {'Move':<6} | {'Result':<6} | {'TTS (s)':>8} | {'Depth':>5} | {'Nodes':>9}")
+    print("-" * 98)
+    for r in results:
+        tts = f"{r['solution_time']:.3f}" if r["solved"] else "-"
+        depth = r["solution_depth"] if r["solved"] else r["depth"]
+        nodes = r["solution_nodes"] if r["solved"] else r["nodes"]
+        print(f"{r['engine']:<28} | {str(r['id'])[:20]:<20} | {r['move'] or '-':<6} | "
+              f"{'ok' if r['solved'] else 'miss':<6} | {tts:>8} | {depth:>5} | {nodes:>9}")
+
+
+def print_summary(summary: List[dict], limit_text: str):
+    print("\n" + "=" * 96)
+    print(f"Tactical suite ({limit_text})")
+    print("=" * 96)
+    header = f"{'Engine':<28} | {'Solved':>9} | {'Mean TTS (s)':>12} | {'Mean depth':>10} | {'Mean nodes':>10} | {'Time':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in summary:
+        mean_time = f"{row['mean_time']:.3f}" if row["solved"] else "-"
+        mean_depth = f"{row['mean_depth']:.1f}" if row["solved"] else "-"
+        mean_nodes = f"{row['mean_nodes']:.0f}" if row["solved"] else "-"
+        print(f"{row['engine']:<28} | {row['solved']:>4}/{row['positions']:<4} | {mean_time:>12} | "
+              f"{mean_depth:>10} | {mean_nodes:>10} | {format_duration(row['total_time']):>8}")
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EPD tactical test suite: solved count and time-to-solution")
+    parser.add_argument("suite", type=str, help='EPD file with bm/am operations (e.g. WAC, ECM)')
+    parser.add_argument("--engines", nargs="+", default=["BetterAlphaBeta"],
+                        help='Engine specs as in AutoBattle, e.g. BetterAlphaBeta BetterAlphaBeta:nullmove=0')
+    parser.add_argument("--movetime", type=float, default=None, help='Seconds per position (default: 5 unless --nodes is given)')
+    parser.add_argument("--nodes", type=int, default=None, help='Node limit per position')
+    parser.add_argument("--count", type=int, default=None, help='Only use the first N positions')
+    parser.add_argument("--workers", type=int, default=None, help='Parallel processes (default: CPU count)')
+    parser.add_argument("--verbose", action='store_true', help='Print the result of every position')
+    parser.add_argument("--jsonl", type=str, default=None, help='Write per-position results to this JSONL file')
+    args = parser.parse_args()
+
+    move_time = args.movetime if args.movetime is not None or args.nodes is not None else 5.0
+    positions = load_suite(args.suite)[:args.count]
+    print(f"{len(positions)} 个局面, {len(args.engines)} 个引擎")
+
+    results = run_suite(args.engines, positions, move_time, args.nodes, args.workers)
+    if args.verbose:
+        print_positions(results)
+    limits = []
+    if move_time is not None:
+        limits.append(f"{move_time:g}s/position")
+    if args.nodes is not None:
+        limits.append(f"{args.nodes} nodes/position")
+    print_summary(summarize(results), ", ".join(limits))
+
+    if args.jsonl:
+        with open(args.jsonl, "w") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+        print(f"逐局面结果已保存至 {args.jsonl}")
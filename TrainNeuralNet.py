@@ -4,7 +4,9 @@ import numpy as np
 import os
 import chess
 import random
-from ChessUtils import board_to_matrix, get_dataset_from_pgn
+import time
+import csv
+from ChessUtils import board_to_matrix, get_dataset_from_pgn, load_dataset, iter_pgn_positions
 
 # 模型保存路径
 MODEL_PATH = './AI-chess/model/chess_model.keras'
@@ -61,24 +63,153 @@ def generate_random_data(num_samples=1000):
         
     return np.array(inputs), np.array(labels)
 
+# === 知识蒸馏 ===
+
+# 学生网络候选结构：按推理开销从大到小
+STUDENT_CONFIGS = {
+    "small": {"conv_filters": (32, 32), "dense_units": (128,)},
+    "tiny": {"conv_filters": (16,), "dense_units": (64,)},
+    "micro": {"conv_filters": (), "dense_units": (32,)},
+}
+
+def create_student_model(conv_filters=(32, 32), dense_units=(128,)):
+    """创建更小的学生网络，输入输出与 create_model() 一致"""
+    model_layers = [layers.Input(shape=(8, 8, 12))]
+    for filters in conv_filters:
+        model_layers.append(layers.Conv2D(filters, kernel_size=(3, 3), activation='relu', padding='same'))
+    model_layers.append(layers.Flatten())
+    for units in dense_units:
+        model_layers.append(layers.Dense(units, activation='relu'))
+    model_layers.append(layers.Dense(1, activation='tanh'))
+
+    model = models.Sequential(model_layers)
+    model.compile(optimizer='adam', loss='mse', metrics=['mae'])
+    return model
+
+def load_unlabeled_positions(source, max_positions=200000):
+    """
+    读取无标签局面用于蒸馏 (标签由教师网络给出)：
+    source 可以是 PGN、CSV 数据集，或 SelfPlay.py 输出的分片目录
+    """
+    inputs = []
+    if os.path.isdir(source):
+        paths = sorted(os.path.join(source, name) for name in os.listdir(source) if name.endswith('.csv'))
+    else:
+        paths = [source]
+
+    for path in paths:
+        if path.lower().endswith('.pgn'):
+            for board, _ in iter_pgn_positions(path):
+                inputs.append(board_to_matrix(board))
+                if len(inputs) >= max_positions:
+                    break
+        else:
+            with open(path, newline='') as f:
+                for row in csv.DictReader(f):
+                    inputs.append(board_to_matrix(chess.Board(row['fen'])))
+                    if len(inputs) >= max_positions:
+                        break
+        if len(inputs) >= max_positions:
+            break
+
+    return np.array(inputs)
+
+def measure_latency(model, inputs, runs=200):
+    """单局面推理延迟 (毫秒，取中位数)，调用方式与 NeuralNetAI 搜索中一致"""
+    samples = []
+    for i in range(runs):
+        input_data = inputs[i % len(inputs)][np.newaxis]
+        start = time.perf_counter()
+        model(input_data, training=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples[runs // 10:]))  # 丢弃前 10% 的预热样本
+
+def distill(teacher, x, student_configs=STUDENT_CONFIGS, epochs=10, batch_size=256,
+            model_dir='./AI-chess/model'):
+    """
+    用教师网络在无标签局面上的输出训练各个学生网络，
+    返回每个学生的延迟与保真度 (相对教师输出的误差) 报告。
+    """
+    print(f"教师网络标注 {len(x)} 个局面...")
+    soft_labels = teacher.predict(x, batch_size=1024, verbose=0).reshape(-1)
+
+    # 留出 10% 局面评估保真度
+    split = int(len(x) * 0.9)
+    x_train, y_train = x[:split], soft_labels[:split]
+    x_test, y_test = x[split:], soft_labels[split:]
+
+    report = [{
+        "name": "teacher",
+        "params": teacher.count_params(),
+        "latency_ms": measure_latency(teacher, x_test),
+        "mae": 0.0,
+        "corr": 1.0,
+        "sign_agree": 1.0,
+    }]
+
+    for name, config in student_configs.items():
+        print(f"\n训练学生网络 {name}: {config}")
+        student = create_student_model(**config)
+        student.fit(x_train, y_train, epochs=epochs, batch_size=batch_size, validation_split=0.1, verbose=2)
+
+        predictions = student.predict(x_test, batch_size=1024, verbose=0).reshape(-1)
+        report.append({
+            "name": name,
+            "params": student.count_params(),
+            "latency_ms": measure_latency(student, x_test),
+            "mae": float(np.mean(np.abs(predictions - y_test))),
+            "corr": float(np.corrcoef(predictions, y_test)[0, 1]),
+            "sign_agree": float(np.mean(np.sign(predictions) == np.sign(y_test))),
+        })
+
+        student_path = os.path.join(model_dir, f"chess_model_student_{name}.keras")
+        student.save(student_path)
+        print(f"学生网络已保存至 {student_path}")
+
+    return report
+
+def print_distill_report(report):
+    """打印延迟-保真度对照表"""
+    header = f"{'Model':<10} | {'Params':>10} | {'Latency ms':>10} | {'MAE':>7} | {'Corr':>6} | {'Sign %':>6}"
+    print("\n" + header)
+    print("-" * len(header))
+    for row in report:
+        print(f"{row['name']:<10} | {row['params']:>10} | {row['latency_ms']:>10.3f} | "
+              f"{row['mae']:>7.4f} | {row['corr']:>6.3f} | {row['sign_agree'] * 100:>5.1f}%")
+
 if __name__ == "__main__":
     # === 配置区域 ===
+    mode = "train"  # "train": 训练模型; "distill": 将 MODEL_PATH 的模型蒸馏为更小的学生网络
     use_real_data = True  # 改为 True 并设置下方路径以训练真正的 AI
     pgn_path = "./AI-chess/training_data/Abdusattorov.pgn" 
+    # 去重后的数据集 (由 PositionDedup.py 生成)，存在时优先使用
+    dataset_path = "./AI-chess/training_data/dedup.csv"
+    # 蒸馏用的无标签局面 (PGN、CSV 数据集或 SelfPlay.py 输出目录)
+    distill_source = "./AI-chess/training_data/selfplay"
+    distill_max_positions = 200000
     # ===============
-    
-    model = create_model()
-    model.summary()
-    
-    if use_real_data and os.path.exists(pgn_path):
-        print(f"从 {pgn_path} 加载数据...")
-        x_train, y_train = get_dataset_from_pgn(pgn_path, max_games=500)
+
+    if mode == "distill":
+        teacher = tf.keras.models.load_model(MODEL_PATH)
+        x_unlabeled = load_unlabeled_positions(distill_source, distill_max_positions)
+        report = distill(teacher, x_unlabeled)
+        print_distill_report(report)
     else:
-        print("未找到PGN文件或处于测试模式，使用随机数据生成演示...")
-        x_train, y_train = generate_random_data(2000)
+        model = create_model()
+        model.summary()
+    
+        if use_real_data and os.path.exists(dataset_path):
+            print(f"从 {dataset_path} 加载数据...")
+            x_train, y_train = load_dataset(dataset_path)
+        elif use_real_data and os.path.exists(pgn_path):
+            print(f"从 {pgn_path} 加载数据...")
+            x_train, y_train = get_dataset_from_pgn(pgn_path, max_games=500)
+        else:
+            print("未找到PGN文件或处于测试模式，使用随机数据生成演示...")
+            x_train, y_train = generate_random_data(2000)
         
-    print(f"开始训练，样本数: {len(x_train)}")
-    model.fit(x_train, y_train, epochs=10, batch_size=32, validation_split=0.1)
+        print(f"开始训练，样本数: {len(x_train)}")
+        model.fit(x_train, y_train, epochs=10, batch_size=32, validation_split=0.1)
     
-    model.save(MODEL_PATH)
-    print(f"模型已保存至 {MODEL_PATH}")
\ No newline at end of file
+        model.save(MODEL_PATH)
+        print(f"模型已保存至 {MODEL_PATH}")
\ No newline at end of file
@@ -0,0 +1,45 @@
+import random
+import chess
+import pytest
+
+from AutoBattle import create_ai, reported_score
+from SelfPlay import create_engine, white_score
+
+# 白方多一个后 / 黑方多一个后，双方各自走棋：(FEN, 走棋方的优劣符号)
+WINNING_POSITIONS = [
+    ("4k3/8/8/8/8/8/3QP3/4K3 w - - 0 1", 1),
+    ("4k3/8/8/8/8/8/3QP3/4K3 b - - 0 1", -1),
+    ("4k3/3qp3/8/8/8/8/8/4K3 w - - 0 1", -1),
+    ("4k3/3qp3/8/8/8/8/8/4K3 b - - 0 1", 1),
+]
+
+# 裁决与走法注释使用的分数 (reported_score) 必须是走棋方视角
+ENGINES = ["ID-Minimax", "AlphaBeta", "BetterAlphaBeta", "NeuralNetAI"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("depth", [1, 2, 3])
+@pytest.mark.parametrize("fen,sign", WINNING_POSITIONS)
+def test_reported_score_is_side_to_move(engine, depth, fen, sign):
+    if engine == "NeuralNetAI":
+        pytest.importorskip("tensorflow")
+    random.seed(0)
+    board = chess.Board(fen)
+    player = create_ai(f"{engine}:depth={depth}", board.turn == chess.WHITE)
+    player.choose_move(board)
+    score = reported_score(player)
+    assert score is not None and score * sign > 0
+
+
+# 自对弈数据集的 score 列为白方视角：白优为正，与走棋方无关
+@pytest.mark.parametrize("engine", ["BetterAlphaBeta", "NeuralNetAI"])
+@pytest.mark.parametrize("fen,sign", WINNING_POSITIONS)
+def test_selfplay_label_is_white_perspective(engine, fen, sign):
+    if engine == "NeuralNetAI":
+        pytest.importorskip("tensorflow")
+    random.seed(0)
+    board = chess.Board(fen)
+    player = create_engine(engine, 2, board.turn == chess.WHITE)
+    player.choose_move(board)
+    white_sign = sign if board.turn == chess.WHITE else -sign
+    assert white_score(board, player) * white_sign > 0
@@ -1,14 +1,15 @@
 import argparse
 from ast import arg
-from PyQt5 import QtGui, QtSvg
+from PyQt5 import QtGui
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import (QApplication, QWidget, QMessageBox, 
-                             QLabel, QVBoxLayout, QInputDialog)  # 新增QInputDialog
+                             QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QInputDialog)  # 新增QInputDialog
 import sys
 import chess, chess.svg
 import traceback
 from NeuralNetAI import NeuralNetAI
+from BoardView import BoardView
 
 # 假设这些AI和游戏类的实现正确（原代码已有）
 from IterativeDeepeningMinimaxAI import IterativeDeepeningMinimaxAI
@@ -19,6 +20,12 @@ from BetterAlphaBetaAI import BetterAlphaBetaAI
 from ChessGame import ChessGame
 import random
 
+# 搜索进度的发布间隔（秒）：引擎在搜索中自行节流，GUI 只负责显示
+PROGRESS_INTERVAL = 0.1
+# 取消思考时在界面线程中最多等待引擎退出的时间（毫秒），超时则不再阻塞界面，之后轮询线程是否结束
+STOP_WAIT_MS = 2000
+STOP_POLL_MS = 100
+
 
 class ChessGui_h2m(QWidget):
     def __init__(self, app, human_player, ai_player):
@@ -29,17 +36,19 @@ class ChessGui_h2m(QWidget):
         self.game = ChessGame(human_player, ai_player)
 
         # 棋盘相关配置
-        self.board_size = 800
+        self.board_size = args.board_size
         self.square_size = self.board_size // 8
 
         # 初始化布局
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 30)
 
-        # 初始化SVG控件（启用抗锯齿，优化渲染）
-        self.svgWidget = QtSvg.QSvgWidget()
-        self.svgWidget.setFixedSize(self.board_size, self.board_size)
-        self.layout.addWidget(self.svgWidget)
+        # 棋盘视图（格子和棋子图片只生成一次，之后只重绘变化的格子）
+        self.board_view = BoardView(self.board_size)
+        self.board_view.square_clicked.connect(self.on_square_clicked)
+        if args.frame_stats:
+            self.board_view.frame_drawn.connect(self.on_frame_drawn)
+        self.layout.addWidget(self.board_view)
 
         # 状态提示标签
         self.status_label = QLabel("游戏开始：人类（白棋）先走", self)
@@ -47,8 +56,25 @@ class ChessGui_h2m(QWidget):
         self.status_label.setStyleSheet("font-size: 16px; color: #333;")
         self.layout.addWidget(self.status_label)
 
+        # AI思考进度（深度、评估、节点数、NPS、主要变例）
+        self.search_label = QLabel("", self)
+        self.search_label.setAlignment(Qt.AlignCenter)
+        self.search_label.setStyleSheet("font-size: 13px; color: #666; font-family: monospace;")
+        self.layout.addWidget(self.search_label)
+
+        # 控制按钮：立即走棋（AI 停止思考，用目前找到的最佳走法）、新对局
+        buttons = QHBoxLayout()
+        self.move_now_button = QPushButton("立即走棋", self)
+        self.move_now_button.setEnabled(False)
+        self.move_now_button.clicked.connect(self.move_now)
+        buttons.addWidget(self.move_now_button)
+        self.new_game_button = QPushButton("新对局", self)
+        self.new_game_button.clicked.connect(self.new_game)
+        buttons.addWidget(self.new_game_button)
+        self.layout.addLayout(buttons)
+
         # 主窗口配置
-        self.setGeometry(900, 400, self.board_size, self.board_size + 50)
+        self.setGeometry(900, 400, self.board_size, self.board_size + 100)
         if args.difficulty == "Easy":
             self.setWindowTitle("AI-CHESS(EASY MODE)")
         elif args.difficulty == "Medium":
@@ -64,6 +90,7 @@ class ChessGui_h2m(QWidget):
         self.legal_moves_for_selected = []
         self.is_ai_thinking = False
         self.ai_thread = None
+        self.stopping_thread = None  # 已取消、等待超时仍未退出的AI线程
 
         # 显示初始棋盘
         self.display_board()
@@ -72,55 +99,51 @@ class ChessGui_h2m(QWidget):
         self.show()
 
     def display_board(self, last_move=None):
-        """生成SVG棋盘，强制实时渲染可走位置的X符号"""
-        highlighted_squares = []  # 可走位置（X符号标记）
-        check_square = None       # 选中棋子（红色标记）
-
-        # 1. 处理选中棋子和可走位置
+        """更新棋盘视图：棋子、上一步、选中棋子及其可走位置（X符号标记）"""
+        self.board_view.set_position(self.game.board, last_move)
         if self.selected_square is not None:
             file, rank = self.selected_square
-            selected_chess_square = chess.square(file, rank)
-            check_square = selected_chess_square  # 选中棋子用红色标记（check参数）
-            highlighted_squares = self.legal_moves_for_selected  # 可走位置用X标记（squares参数）
-
-        # 2. 生成SVG（关键优化：明确区分选中棋子和可走位置，强制渲染X符号）
-        svgboard = chess.svg.board(
-            self.game.board,
-            lastmove=last_move,          # 上一步走法（灰色高亮）
-            squares=highlighted_squares, # 可走位置（X符号）
-            check=check_square,          # 选中棋子（红色高亮）
-            size=self.board_size,
-            colors={
-                'square light': '#f0d9b5',
-                'square dark': '#b58863',
-                'check': '#ffcccc'       # 选中棋子的红色高亮（浅红，不刺眼）
-            }
-        )
-
-        # 3. 强制刷新SVG（解决渲染延迟问题）
-        svgbytes = QByteArray(svgboard.encode('utf-8'))
-        self.svgWidget.load(svgbytes)
-        self.svgWidget.update()  # 强制控件刷新
-        self.app.processEvents() # 处理未完成的GUI事件，确保实时显示
-
-    def mousePressEvent(self, event):
-        """监听鼠标点击事件"""
-        if (self.game.board.turn != self.human_is_white) or self.is_ai_thinking:
-            return
+            self.board_view.set_selection(chess.square(file, rank), self.legal_moves_for_selected)
+        else:
+            self.board_view.set_selection(None)
 
-        x = event.x()
-        y = event.y()
-        if y >= self.board_size:
+    def on_square_clicked(self, chess_square):
+        """棋盘视图的点击事件"""
+        if (self.game.board.turn != self.human_is_white) or self.is_ai_thinking:
             return
-        file = x // self.square_size
-        rank = 7 - (y // self.square_size)
-        square = (file, rank)
 
+        square = (chess.square_file(chess_square), chess.square_rank(chess_square))
         if self.selected_square is None:
             self.select_piece(square)
         else:
             self.try_move(square)
 
+    def show_warning(self, title, text):
+        """
+        先刷新棋盘再弹出警告：棋盘在模态对话框的事件循环中完成重绘，
+        点击到重绘的延迟 (--frame-stats) 不包含对话框停留的时间
+        """
+        self.display_board()
+        QMessageBox.warning(self, title, text)
+
+    def on_frame_drawn(self, latency_ms):
+        """--frame-stats：打印点击到重绘完成的延迟"""
+        print(f"点击到重绘：{latency_ms:.1f} ms")
+
+    def closeEvent(self, event):
+        """关闭窗口时取消AI思考并等待线程退出；引擎迟迟不返回时先隐藏窗口，线程退出后再关闭"""
+        self.stop_ai_thread()
+        if self.engine_busy():
+            self.hide()
+            event.ignore()
+            QTimer.singleShot(STOP_POLL_MS, self.close)
+            return
+        if args.frame_stats:
+            stats = self.board_view.frame_timer.summary()
+            print(f"重绘延迟：{stats['count']} 次点击，平均 {stats['mean']:.1f} ms，"
+                  f"P95 {stats['p95']:.1f} ms，最大 {stats['max']:.1f} ms")
+        super().closeEvent(event)
+
     def select_piece(self, square):
         """选中棋子，实时计算并显示可走位置"""
         # 清空之前的状态（避免残留）
@@ -146,10 +169,10 @@ class ChessGui_h2m(QWidget):
                 print(f"合法走法：{[chess.square_name(m) for m in self.legal_moves_for_selected]}")
             else:
                 self.status_label.setText("选中失败：这不是你的棋子！")
-                QMessageBox.warning(self, "选中失败", "这不是你的棋子！")
+                self.show_warning("选中失败", "这不是你的棋子！")
         else:
             self.status_label.setText("选中失败：该格子上没有棋子！")
-            QMessageBox.warning(self, "选中失败", "该格子上没有棋子！")
+            self.show_warning("选中失败", "该格子上没有棋子！")
 
         # 强制刷新棋盘（关键：确保选中时立即显示X符号）
         self.display_board()
@@ -175,6 +198,8 @@ class ChessGui_h2m(QWidget):
         # 关键步骤2：如果是升变，让人类选择升变棋子
         if is_pawn_promotion:
             # 弹出选择框：后（最强）、车、象、马
+            # 对话框停留的时间不属于重绘延迟，这次点击不计入 --frame-stats
+            self.board_view.frame_timer.cancel()
             promotion_piece, ok = QInputDialog.getItem(
                 self,
                 "兵升变",
@@ -221,38 +246,97 @@ class ChessGui_h2m(QWidget):
                 QTimer.singleShot(500, self.ai_move)
             else:
                 self.status_label.setText(f"走法无效：{move_uci}")
-                QMessageBox.warning(self, "走法无效", f"从 {start_uci} 到 {target_uci} 是无效走法！")
                 # 清空选中状态（但保留走法无效的提示）
                 self.selected_square = None
                 self.legal_moves_for_selected = []
-                self.display_board()
+                self.show_warning("走法无效", f"从 {start_uci} 到 {target_uci} 是无效走法！")
         except ValueError:
             self.status_label.setText(f"格式错误：{move_uci}")
-            QMessageBox.warning(self, "格式错误", f"走法 {move_uci} 格式无效！")
             self.selected_square = None
             self.legal_moves_for_selected = []
-            self.display_board()
+            self.show_warning("格式错误", f"走法 {move_uci} 格式无效！")
 
     def ai_move(self):
         """AI走棋（持有线程引用，避免被销毁）"""
+        if not self.is_ai_thinking:
+            # 延迟触发前已开始新对局
+            return
         if self.game.exit_game():
             self.show_game_result()
             return
 
-        # 确保之前的线程已结束
-        if self.ai_thread is not None and self.ai_thread.isRunning():
-            self.ai_thread.quit()
-            self.ai_thread.wait()
+        # 确保之前的线程已结束；被取消的旧线程仍在运行时稍后再试（两个线程不能同时使用同一个引擎）
+        self.stop_ai_thread()
+        if self.engine_busy():
+            QTimer.singleShot(STOP_POLL_MS, self.ai_move)
+            return
 
         # 创建AI线程并持有引用
         self.ai_thread = AIThinkingThread(self.ai_player, self.game.board)
         self.ai_thread.finished.connect(self.clear_ai_thread)
         self.ai_thread.finished_signal.connect(self.on_ai_move_finished)
+        self.ai_thread.progress_signal.connect(self.on_search_progress)
         self.ai_thread.start()
+        self.move_now_button.setEnabled(True)
+
+    def on_search_progress(self, info):
+        """AI线程发来的搜索进度（SearchInfo）"""
+        if self.sender() is not self.ai_thread or self.ai_thread.cancelled:
+            return
+        parts = [f"深度 {info.depth}"]
+        if info.score is not None:
+            parts.append(f"评估 {info.score / 100:+.2f}")
+        parts.append(f"节点 {info.nodes}")
+        parts.append(f"NPS {info.nps:.0f}")
+        if info.pv:
+            try:
+                parts.append(f"主要变例 {self.game.board.variation_san(info.pv)}")
+            except ValueError:
+                parts.append("主要变例 " + " ".join(move.uci() for move in info.pv))
+        self.search_label.setText("  ".join(parts))
+        if args.show_arrow and info.pv:
+            self.board_view.set_arrow(info.pv[0])
+
+    def move_now(self):
+        """立即走棋：让引擎停止搜索，返回目前找到的最佳走法"""
+        if self.ai_thread is not None and self.ai_thread.isRunning():
+            self.status_label.setText("AI立即走棋...")
+            self.ai_thread.move_now()
+
+    def stop_ai_thread(self):
+        """
+        取消正在进行的AI思考（结果丢弃），最多等待 STOP_WAIT_MS 毫秒让线程退出；
+        超时的线程保存在 stopping_thread 中（保持引用直到结束），不阻塞界面
+        """
+        if self.ai_thread is not None:
+            self.ai_thread.cancel()
+            if not self.ai_thread.wait(STOP_WAIT_MS):
+                print("AI线程未能及时退出，将在后台结束")
+                self.stopping_thread = self.ai_thread
+                self.ai_thread = None
+        self.move_now_button.setEnabled(False)
+        self.board_view.set_arrow(None)
+
+    def new_game(self):
+        """取消AI思考，重新开始一局"""
+        self.stop_ai_thread()
+        self.is_ai_thinking = False
+        self.game = ChessGame(self.human_player, self.ai_player)
+        if hasattr(self.ai_player, 'new_game'):
+            self.ai_player.new_game()
+        self.selected_square = None
+        self.legal_moves_for_selected = []
+        self.status_label.setText("新对局：人类（白棋）先走")
+        self.display_board()
 
     def on_ai_move_finished(self, ai_move):
         """AI走棋完成回调，校验并补全AI的兵升变"""
+        if self.sender() is not self.ai_thread or self.ai_thread.cancelled:
+            # 已取消的思考（新对局/关闭窗口前已发出的信号）
+            return
         self.is_ai_thinking = False
+        self.move_now_button.setEnabled(False)
+        self.board_view.set_arrow(None)
         if not ai_move:
             self.status_label.setText("AI无法生成走法 → 人类回合")
             QMessageBox.warning(self, "AI错误", "AI无法生成有效走法，请你继续走棋！")
@@ -290,9 +374,16 @@ class ChessGui_h2m(QWidget):
         if self.game.exit_game():
             self.show_game_result()
 
+    def engine_busy(self):
+        """被取消的旧线程是否仍在使用引擎"""
+        if self.stopping_thread is not None and not self.stopping_thread.isRunning():
+            self.stopping_thread = None
+        return self.stopping_thread is not None
+
     def clear_ai_thread(self):
-        """线程结束后清理引用"""
-        self.ai_thread = None
+        """线程结束后清理引用（旧线程的结束信号不影响新线程）"""
+        if self.sender() is self.ai_thread:
+            self.ai_thread = None
 
     def square_to_uci(self, square):
         """棋盘坐标→UCI格式"""
@@ -314,28 +405,43 @@ class ChessGui_h2m(QWidget):
         QMessageBox.information(self, "游戏结束", text)
         QTimer.singleShot(2000, self.app.quit)
 
-    def __del__(self):
-        """析构函数：确保线程结束后再销毁对象"""
-        if self.ai_thread is not None and self.ai_thread.isRunning():
-            self.ai_thread.quit()
-            self.ai_thread.wait()
-
 
 class AIThinkingThread(QThread):
     """AI思考子线程"""
     finished_signal = pyqtSignal(chess.Move)
+    progress_signal = pyqtSignal(object)  # SearchInfo：每完成一层及搜索中按 PROGRESS_INTERVAL 节流发出
 
     def __init__(self, ai_player, board):
         super().__init__()
         self.ai_player = ai_player
         self.board = board.copy()
-        self.setTerminationEnabled(True)  # 允许线程被终止
+        self.cancelled = False
+        # 在线程启动前 (GUI 线程中) 清除上一次思考结束后才到达的停止请求；
+        # 此后的 move_now / cancel 即使早于 choose_move 开始也会生效
+        if hasattr(ai_player, 'stop_requested'):
+            ai_player.stop_requested = False
+
+    def move_now(self):
+        """停止搜索，仍然使用搜索结果"""
+        if hasattr(self.ai_player, 'stop'):
+            self.ai_player.stop()
+
+    def cancel(self):
+        """停止搜索并丢弃结果（run 返回后不再发出 finished_signal）"""
+        self.cancelled = True
+        self.move_now()
 
     def run(self):
         """线程执行：计算AI走法"""
         try:
             print(f"AI线程启动：当前回合{self.board.turn}（True=白，False=黑）")
+            if hasattr(self.ai_player, 'progress_interval'):
+                self.ai_player.info_sink = self.progress_signal.emit
+                self.ai_player.progress_interval = PROGRESS_INTERVAL
             ai_move = self.ai_player.choose_move(self.board)
+            if self.cancelled:
+                print("AI思考已取消")
+                return
             print(f"AI计算完成：{ai_move.uci() if ai_move else '无有效走法'}")
             self.finished_signal.emit(ai_move)
         except Exception as e:
@@ -343,11 +449,18 @@ class AIThinkingThread(QThread):
             traceback.print_exc()
             print("======================\n")
             self.finished_signal.emit(None)
+        finally:
+            if hasattr(self.ai_player, 'progress_interval'):
+                self.ai_player.info_sink = None
+                self.ai_player.progress_interval = None
 
 
 def parse_arguments():
         parser = argparse.ArgumentParser(description="Chess Game Parameters")
         parser.add_argument("--difficulty", type=str, default="Easy",choices=["Easy", "Medium", "Hard","Neural"], help='Game difficulty level')
+        parser.add_argument("--board-size", type=int, default=800, help='Board size in pixels')
+        parser.add_argument("--frame-stats", action='store_true', help='Print the latency from each click to the redraw')
+        parser.add_argument("--show-arrow", action='store_true', help="Draw the AI's current best move while it thinks")
         return parser.parse_args()
 
 if __name__ == "__main__":
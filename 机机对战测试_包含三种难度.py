@@ -2,12 +2,13 @@
 # 9 October 2020
 # Chess AI Assignment CS76 F20
 import argparse
-from PyQt5 import QtGui, QtSvg
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-from PyQt5.QtWidgets import QApplication, QWidget, QMessageBox  # 导入QMessageBox
+from PyQt5.QtWidgets import QApplication, QWidget, QMessageBox, QLabel, QVBoxLayout  # 导入QMessageBox
 import sys
-import chess, chess.svg
+import time
+import traceback
+import chess
 
 from IterativeDeepeningMinimaxAI import IterativeDeepeningMinimaxAI
 from RandomAI import RandomAI
@@ -16,73 +17,174 @@ from AlphaBetaAI import AlphaBetaAI
 from BetterAlphaBetaAI import BetterAlphaBetaAI
 from ChessGame import ChessGame
 from NeuralNetAI import NeuralNetAI
+from BoardView import BoardView
 
 import random
 
+# 停止对局时在界面线程中最多等待后台线程退出的时间（毫秒），超时则不再阻塞界面，之后轮询线程是否结束
+STOP_WAIT_MS = 2000
+STOP_POLL_MS = 100
 
-class ChessGui:
-    def __init__(self, player1, player2):
+
+class AIGameWorker(QThread):
+    """
+    后台线程：两个引擎在自己的 ChessGame 上轮流走棋，每步完成后发出 move_ready。
+    每走一步前取一个许可 (QSemaphore)，界面显示完一步后归还一个：
+    初始 1 个许可时搜索与显示交替进行；初始 2 个许可 (流水线模式) 时下一步的搜索与上一步的显示同时进行
+    """
+    move_ready = pyqtSignal(object, float)  # 走法, 搜索用时 (秒)
+    error = pyqtSignal(str)
+
+    def __init__(self, player1, player2, pipeline=False):
+        super().__init__()
+        self.game = ChessGame(player1, player2)
+        self.permits = QSemaphore(2 if pipeline else 1)
+        self.stopped = False
+
+    def run(self):
+        try:
+            while not self.stopped and not self.game.board.is_game_over():
+                self.permits.acquire()
+                if self.stopped:
+                    break
+                start = time.time()
+                move = self.game.make_move()
+                if self.stopped:
+                    break
+                self.move_ready.emit(move, time.time() - start)
+        except Exception:
+            traceback.print_exc()
+            self.error.emit(traceback.format_exc(limit=1))
+
+    def move_shown(self):
+        """界面显示完一步后调用，允许引擎计算下一步"""
+        self.permits.release()
+
+    def stop(self):
+        """停止对局：中止正在进行的搜索，唤醒等待许可的线程"""
+        self.stopped = True
+        for player in self.game.players:
+            if hasattr(player, 'stop'):
+                player.stop()
+        self.permits.release()
+
+
+class ChessGui(QWidget):
+    def __init__(self, app, player1, player2, delay=500, pipeline=False, board_size=800):
+        super().__init__()
+        self.app = app
         self.player1 = player1
         self.player2 = player2
-        self.game = ChessGame(player1, player2)
-        self.app = QApplication(sys.argv)
-        self.svgWidget = QtSvg.QSvgWidget()
-        self.svgWidget.setGeometry(800, 300, 1000, 1000)
-        self.svgWidget.show()
-        self.timer = QTimer()  # 将timer设为实例变量，方便停止
-
+        self.delay = delay  # 每步显示的时间 (毫秒)
+        self.board = chess.Board()  # 界面显示的棋盘，只在主线程中修改
+        self.pending_moves = []  # 已算出、尚未显示的走法
+        self.showing = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.board_view = BoardView(board_size)
+        layout.addWidget(self.board_view)
+        self.status_label = QLabel("白方思考中...", self)
+        self.status_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.status_label)
+        self.setGeometry(800, 300, board_size, board_size + 30)
+        self.setWindowTitle("AI-CHESS(AI VS AI)")
+
+        # 引擎在后台线程中运行，主线程只负责显示
+        self.worker = AIGameWorker(player1, player2, pipeline)
+        self.worker.move_ready.connect(self.on_move_ready)
+        self.worker.error.connect(self.on_worker_error)
 
     def start(self):
-        self.timer.timeout.connect(self.make_move)
-        self.timer.start(50)
         self.display_board()
+        self.show()
+        self.worker.start()
 
     def display_board(self):
-        svgboard = chess.svg.board(self.game.board)
-        svgbytes = QByteArray()
-        svgbytes.append(svgboard)
-        self.svgWidget.load(svgbytes)
-
-    def make_move(self):
-        print("making move, white turn " + str(self.game.board.turn))
-
-        if not self.game.exit_game():
-            self.game.make_move()
-            self.display_board()
-            
-            # 每次落子后检查游戏是否结束
-            self.check_game_end()
-        else:
-            # 游戏已结束（可能是上一轮结束的），直接检查并弹窗
-            self.check_game_end()
+        self.board_view.set_position(self.board)
+
+    def on_move_ready(self, move, seconds):
+        """后台线程算出一步：排队等待显示"""
+        self.pending_moves.append((move, seconds))
+        if not self.showing:
+            self.show_next_move()
+
+    def show_next_move(self):
+        if not self.pending_moves:
+            self.showing = False
+            return
+        self.showing = True
+        move, seconds = self.pending_moves.pop(0)
+        side = "白方" if self.board.turn else "黑方"
+        self.board.push(move)
+        self.display_board()
+        print(f"{side}: {move.uci()} ({seconds:.2f}s)")
+        self.status_label.setText(f"第 {len(self.board.move_stack)} 步 {side}: {move.uci()}（用时 {seconds:.2f} 秒）")
+
+        # 每步落子后检查游戏是否结束
+        if self.check_game_end():
+            return
+        QTimer.singleShot(self.delay, self.on_move_shown)
+
+    def on_move_shown(self):
+        """一步显示时间结束：允许后台线程计算下一步，显示队列中的下一步"""
+        self.worker.move_shown()
+        self.show_next_move()
+
+    def on_worker_error(self, message):
+        QMessageBox.warning(self, "AI错误", message)
 
     def check_game_end(self):
-        """检查游戏是否结束，若结束则弹窗提示并停止计时器"""
-        board = self.game.board
+        """检查游戏是否结束，若结束则弹窗提示并停止后台线程"""
+        board = self.board
         # 1. 检查将死（胜利条件）
         if board.is_checkmate():
             winner = "白方" if not board.turn else "黑方"  # 此时turn是输家的回合（因为刚结束）
-            QMessageBox.information(self.svgWidget, "游戏结束", f"{winner}胜利！（将死）")
-            self.timer.stop()  # 停止计时器，游戏终止
+            text = f"{winner}胜利！（将死）"
         # 2. 检查平局条件（可选，避免无限循环）
         elif board.is_stalemate():
-            QMessageBox.information(self.svgWidget, "游戏结束", "平局！（困毙）")
-            self.timer.stop()
+            text = "平局！（困毙）"
         elif board.is_insufficient_material():
-            QMessageBox.information(self.svgWidget, "游戏结束", "平局！（双方子力不足以将死）")
-            self.timer.stop()
+            text = "平局！（双方子力不足以将死）"
         elif board.is_seventyfive_moves():
-            QMessageBox.information(self.svgWidget, "游戏结束", "平局！（75步规则）")
-            self.timer.stop()
+            text = "平局！（75步规则）"
         elif board.is_fivefold_repetition():
-            QMessageBox.information(self.svgWidget, "游戏结束", "平局！（五重重复）")
-            self.timer.stop()
+            text = "平局！（五重重复）"
+        else:
+            return False
+        self.stop_worker()
+        self.status_label.setText(f"游戏结束：{text}")
+        QMessageBox.information(self, "游戏结束", text)
+        return True
+
+    def stop_worker(self) -> bool:
+        """停止后台线程，最多等待 STOP_WAIT_MS 毫秒；返回线程是否已退出 (未退出的线程在当前搜索结束后自行退出)"""
+        self.worker.stop()
+        return self.worker.wait(STOP_WAIT_MS)
+
+    def closeEvent(self, event):
+        """关闭窗口时中止搜索并等待后台线程退出；引擎迟迟不返回时先隐藏窗口，线程退出后再关闭"""
+        if not self.stop_worker():
+            self.hide()
+            event.ignore()
+            QTimer.singleShot(STOP_POLL_MS, self.close_when_stopped)
+            return
+        super().closeEvent(event)
+
+    def close_when_stopped(self):
+        if self.worker.isRunning():
+            QTimer.singleShot(STOP_POLL_MS, self.close_when_stopped)
+        else:
+            self.close()
 
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Chess Game Parameters")
     parser.add_argument("--white-difficulty", type=str, default="Easy",choices=["Easy", "Medium", "Hard","Neural"], help='White difficulty level')
     parser.add_argument("--black-difficulty", type=str, default="Easy",choices=["Easy", "Medium", "Hard","Neural"], help='Black difficulty level')
+    parser.add_argument("--delay", type=int, default=500, help='Milliseconds each move stays on screen before the next one')
+    parser.add_argument("--pipeline", action='store_true', help='Search the next move while the previous one is on screen')
+    parser.add_argument("--board-size", type=int, default=800, help='Board size in pixels')
     return parser.parse_args()
 
 
@@ -112,6 +214,7 @@ if __name__ == "__main__":
         player2 = NeuralNetAI(2, True)
 
     # 初始化游戏和GUI
-    gui = ChessGui(player1, player2)
+    app = QApplication(sys.argv)
+    gui = ChessGui(app, player1, player2, args.delay, args.pipeline, args.board_size)
     gui.start()
-    sys.exit(gui.app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())
\ No newline at end of file